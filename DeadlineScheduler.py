@@ -0,0 +1,336 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        DeadlineScheduler
+# Purpose:     Timer / deadline scheduler on FibonacciHeap: deadlines pulled
+#              earlier are O(1) amortized decrease keys and cancellations are
+#              deletes, with an optional asyncio (or trollius) event loop driving
+#              the due timers through a single loop timer
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import heapq
+from time import time
+import numpy as np
+from FibonacciHeap import FibonacciHeap
+
+try:
+    import asyncio
+except ImportError:  # Python 2, use the backport if it is installed
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+
+class Timer(object):
+    """
+    A scheduled callback.  The timer itself is the object stored in the heap,
+    its deadline is the priority of its heap node.
+
+    self.callback, self.args: called as callback(*args) when the deadline is reached
+    self.cancelled: True once cancelled
+    """
+
+    def __init__(self, scheduler, callback, args):
+        self._scheduler = scheduler
+        self._node = None
+        self.callback, self.args = callback, args
+        self.cancelled = False
+
+    @property
+    def deadline(self):
+        """
+        :return: the deadline, None once the timer has run or was cancelled
+        """
+        return self._node.priority if self._node is not None else None
+
+    def cancel(self):
+        self._scheduler.cancel(self)
+
+    def __str__(self):
+        return "Timer({}, {})".format(self.deadline, self.callback)
+
+
+class DeadlineScheduler(object):
+    """
+    Timers ordered by deadline in a FibonacciHeap.
+
+    Without an event loop, the owner calls run_due periodically (e.g., once per iteration
+    of its own loop).  With an asyncio event loop, exactly one loop timer is armed at the
+    earliest deadline; it is re-armed only when the earliest deadline moves earlier, so
+    pulling a deadline in costs a decrease key and not a cancelled loop handle.
+    """
+
+    def __init__(self, loop=None, clock=None):
+        """
+        :param loop: an asyncio event loop, or None to call run_due by hand
+        :param clock: function returning the current time, loop.time() by default
+                      with a loop and time.time otherwise
+        """
+        self._heap = FibonacciHeap()
+        self._loop = loop
+        if clock is None:
+            clock = loop.time if loop is not None else time
+        self._clock = clock
+        self._armed = None  # (deadline, loop handle) of the loop timer
+        self._waiters = []  # futures of wait_next
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, deadline, callback, *args):
+        """
+        Call callback(*args) at the given deadline.
+
+        :return: the Timer
+        """
+        timer = Timer(self, callback, args)
+        timer._node = self._heap.insert(timer, deadline)
+        self._arm()
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        return self.schedule(self._clock() + delay, callback, *args)
+
+    def reschedule(self, timer, deadline):
+        """
+        Move the deadline of a pending timer.  Pulling it earlier is a decrease key;
+        pushing it later is a general priority update.
+        """
+        if timer not in self._heap:
+            raise KeyError("Timer %s is not pending!" % timer)
+        if deadline < timer._node.priority:
+            self._heap.decrease_key(timer._node, deadline)
+            self._arm()
+        else:
+            self._heap.update_priority(timer._node, deadline)
+
+    def cancel(self, timer):
+        """Cancel a pending timer; cancelling a timer that already ran does nothing."""
+        if timer in self._heap:
+            self._heap.delete(timer._node)
+            timer._node = None
+            timer.cancelled = True
+
+    def next_deadline(self):
+        """
+        :return: the earliest deadline, None if no timer is pending
+        """
+        node = self._heap.min()
+        return node.priority if node is not None else None
+
+    def run_due(self, now=None):
+        """
+        Run the callbacks of all the timers whose deadline is not after now,
+        in order of deadline, and wake up the futures of wait_next.
+
+        :param now: current time, self.clock() by default
+        :return: number of callbacks run
+        """
+        now = self._clock() if now is None else now
+        heap = self._heap
+        count = 0
+        while len(heap) and heap.min().priority <= now:
+            timer = heap.extract_min().obj
+            timer._node = None
+            timer.callback(*timer.args)
+            count += 1
+
+        if count and self._waiters:
+            waiters, self._waiters = self._waiters, []
+            for future in waiters:
+                if not future.done():
+                    future.set_result(now)
+        return count
+
+    def wait_next(self):
+        """
+        :return: a future of the event loop, resolved with the time at which the
+                 next batch of due timers has run
+        """
+        if self._loop is None:
+            raise RuntimeError("wait_next needs an event loop!")
+        if hasattr(self._loop, 'create_future'):
+            future = self._loop.create_future()
+        else:
+            future = asyncio.Future(loop=self._loop)
+        self._waiters.append(future)
+        return future
+
+    def close(self):
+        """Disarm the loop timer; the pending timers are dropped."""
+        if self._armed is not None:
+            self._armed[1].cancel()
+            self._armed = None
+        self._heap = FibonacciHeap()
+
+    def _arm(self):
+        if self._loop is None:
+            return
+        deadline = self.next_deadline()
+        if deadline is None or (self._armed is not None and self._armed[0] <= deadline):
+            return
+        if self._armed is not None:
+            self._armed[1].cancel()
+        self._armed = (deadline, self._loop.call_at(deadline, self._on_timer))
+
+    def _on_timer(self):
+        self._armed = None
+        self.run_due()
+        self._arm()
+
+
+class _HeapqScheduler(object):
+    """
+    Timer heap as kept by asyncio's event loop (BaseEventLoop._scheduled): a heapq of
+    [deadline, seq, callback] entries, cancelled entries flagged and skipped when they
+    reach the top, and the heap rebuilt when more than half of it is cancelled.
+    Rescheduling is a cancel and a new entry.  Baseline of benchmark.
+    """
+
+    def __init__(self):
+        self._scheduled = []
+        self._cancelled = 0
+        self._seq = 0
+
+    def schedule(self, deadline, callback):
+        entry = [deadline, self._seq, callback]
+        self._seq += 1
+        heapq.heappush(self._scheduled, entry)
+        return entry
+
+    def cancel(self, entry):
+        entry[2] = None
+        self._cancelled += 1
+        if self._cancelled > 100 and self._cancelled * 2 > len(self._scheduled):
+            self._scheduled = [e for e in self._scheduled if e[2] is not None]
+            heapq.heapify(self._scheduled)
+            self._cancelled = 0
+
+    def reschedule(self, entry, deadline):
+        callback = entry[2]
+        self.cancel(entry)
+        return self.schedule(deadline, callback)
+
+    def run_due(self, now):
+        scheduled = self._scheduled
+        count = 0
+        while scheduled and scheduled[0][0] <= now:
+            entry = heapq.heappop(scheduled)
+            if entry[2] is None:
+                self._cancelled -= 1
+            else:
+                entry[2]()
+                count += 1
+        return count
+
+
+def test_scheduler(n):
+    rng = np.random.RandomState(0)
+    deadlines = rng.random_sample(n).tolist()
+    fired = []
+    scheduler = DeadlineScheduler(clock=lambda: 0.0)
+    timers = [scheduler.schedule(d, fired.append, i) for i, d in enumerate(deadlines)]
+
+    for i in xrange(0, n, 2):
+        deadlines[i] /= 2
+        scheduler.reschedule(timers[i], deadlines[i])
+    for i in xrange(1, n, 4):
+        deadlines[i] += 1
+        scheduler.reschedule(timers[i], deadlines[i])
+    cancelled = set(xrange(3, n, 6))
+    for i in cancelled:
+        timers[i].cancel()
+
+    count = scheduler.run_due(0.5) + scheduler.run_due(np.inf)
+    expected = sorted((i for i in xrange(n) if i not in cancelled), key=lambda i: deadlines[i])
+
+    if fired == expected and count == len(expected) and not len(scheduler):
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def test_event_loop(delays=(0.03, 0.01, 0.02)):
+    """Run timers on an asyncio event loop, pulling one deadline earlier."""
+    if asyncio is None:
+        print "test_event_loop: neither asyncio nor trollius is installed, skipped"
+        return
+    loop = asyncio.new_event_loop()
+    scheduler = DeadlineScheduler(loop)
+    fired = []
+    timers = [scheduler.call_later(delay, fired.append, i) for i, delay in enumerate(delays)]
+    scheduler.reschedule(timers[0], loop.time())
+    loop.run_until_complete(scheduler.wait_next())
+    loop.call_later(max(delays) + 0.01, loop.stop)
+    loop.run_forever()
+    scheduler.close()
+    loop.close()
+
+    if fired == [0, 1, 2]:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(n=10 ** 6, reschedules=4, seed=0):
+    """
+    Schedule n timers, pull every deadline earlier reschedules times, then run them all.
+    DeadlineScheduler against the asyncio style heapq with cancelled entries; with asyncio
+    installed, also the cost of scheduling and rescheduling with loop.call_at handles
+    (cancel and call_at again), whose timers cannot be run without waiting for them.
+    """
+    rng = np.random.RandomState(seed)
+    deadlines = (rng.random_sample(n) + reschedules).tolist()
+    factors = rng.random_sample(n).tolist()
+    noop = lambda: None
+
+    def rounds(schedule, reschedule):
+        timers = [schedule(d, noop) for d in deadlines]
+        schedule_time = time()
+        for r in xrange(reschedules):
+            for i, (timer, f) in enumerate(zip(timers, factors)):
+                timers[i] = reschedule(timer, deadlines[i] - r - f) or timer
+        return schedule_time
+
+    print '\t'.join(['scheduler', 'schedule', 'reschedule', 'run', 'total'])
+
+    scheduler = DeadlineScheduler(clock=lambda: 0.0)
+    start = time()
+    reschedule_start = rounds(scheduler.schedule, scheduler.reschedule)
+    run_start = time()
+    scheduler.run_due(np.inf)
+    end = time()
+    print 'fibheap\t{:0.3f}\t{:0.3f}\t{:0.3f}\t{:0.3f}'.format(
+        reschedule_start - start, run_start - reschedule_start, end - run_start, end - start)
+
+    baseline = _HeapqScheduler()
+    start = time()
+    reschedule_start = rounds(baseline.schedule, baseline.reschedule)
+    run_start = time()
+    baseline.run_due(np.inf)
+    end = time()
+    print 'heapq\t{:0.3f}\t{:0.3f}\t{:0.3f}\t{:0.3f}'.format(
+        reschedule_start - start, run_start - reschedule_start, end - run_start, end - start)
+
+    if asyncio is not None:
+        loop = asyncio.new_event_loop()
+
+        def reschedule(handle, deadline):
+            handle.cancel()
+            return loop.call_at(deadline, noop)
+
+        start = time()
+        reschedule_start = rounds(loop.call_at, reschedule)
+        end = time()
+        print 'call_at\t{:0.3f}\t{:0.3f}\t-\t-'.format(reschedule_start - start, end - reschedule_start)
+        loop.close()
+
+
+if __name__ == '__main__':
+    test_scheduler(10000)
+    test_event_loop()
+    benchmark()
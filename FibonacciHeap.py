@@ -10,8 +10,8 @@
 # Copyright:   (c) Di Zhuang 2015
 # -------------------------------------------------------------------------------
 
-from scipy.constants import golden
-from collections import deque
+import heapq
+import random
 import numpy as np
 
 
@@ -39,11 +39,12 @@ class Element(object):
 
     self.obj: any object (e.g., a vertex or an edge for a graph algorithm)
     self.priority: priority of this node
-    self.left, self.right: pointers to the siblings of this node
+    self.left, self.right: pointers to the siblings of this node, None once it left the heap
     self.parent: the parent of this node
     self.child: one of the children of this node
     self.degree: the degree of this node
     self.mark: whether this node has lost one of its children
+    self.generation: number of times this node was reused from a pool
     """
 
     def __init__(self, obj, priority):
@@ -53,6 +54,19 @@ class Element(object):
         self.parent = None
         self.degree = 0
         self.mark = False
+        self.generation = 0
+
+    def reset(self, obj, priority):
+        """
+        Reuse this node for another (obj, priority) pair, as a new generation
+        """
+        self.obj, self.priority = obj, priority
+        self.left = self.right = self
+        self.child = None
+        self.parent = None
+        self.degree = 0
+        self.mark = False
+        self.generation += 1
 
     def get_value(self):
         """
@@ -105,12 +119,54 @@ class FibonacciHeap(object):
     Implements Fibonacci Heap
     """
 
-    def __init__(self):
+    def __init__(self, pool=False):
         """
         Creates an empty heap
+
+        :param pool: reuse the nodes of extracted elements for later inserts instead of
+                     allocating new ones.  An extracted element then stays valid only until
+                     the next insert; a caller keeping handles longer should keep their
+                     generation too and check them with is_live.
         """
         self._size = 0
         self._min = None
+        self._dict = {}
+        self._degrees = []  # degree table of _consolidate, reused between calls
+        self._pool = [] if pool else None
+
+    def __getitem__(self, item):
+        """
+        :return: the element holding item; if item was inserted more than once, the
+                 element of the last insert still in the heap
+        """
+        try:
+            return self._dict[item]
+        except KeyError:
+            raise KeyError("Object %s no longer in heap!" % item)
+
+    def __contains__(self, item):
+        return item in self._dict
+
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        return self._dict.get(item, default)
+
+    def is_live(self, x, generation=None):
+        """
+        :param x: a node returned by insert
+        :param generation: x.generation when it was returned, to detect a node reused
+                           from the pool for another insert
+        :return: whether x is in the heap (in the same generation)
+        """
+        return x.left is not None and (generation is None or x.generation == generation)
+
+    def _check_live(self, x):
+        if x.left is None:
+            raise KeyError("Stale handle %s, no longer in heap!" % x)
 
     def insert(self, x, priority):
         """
@@ -121,12 +177,18 @@ class FibonacciHeap(object):
 
         O(1) operation.
 
-        :param x: obj associated with priority
+        :param x: obj associated with priority, hashable.  The same object may be inserted
+                  more than once: every insert returns its own node, and heap[x] is the last one
         :param priority: priority of the object
         :return: an reference to the inserted node
         """
 
-        elem = Element(x, priority)
+        if self._pool:
+            elem = self._pool.pop()
+            elem.reset(x, priority)
+        else:
+            elem = Element(x, priority)
+        self._dict[x] = elem
 
         self._insert_to_root_list(elem)
 
@@ -177,8 +239,84 @@ class FibonacciHeap(object):
 
             self._size -= 1
 
+            self._discard(z)
+            if self._pool is not None:
+                self._pool.append(z)
+
         return z
 
+    def extract_k_min(self, k):
+        """
+        Remove the k elements with the smallest priorities (all of them if the heap has
+        fewer) from the heap.  Unlike k calls to extract_min, the heap is consolidated
+        only once: the k smallest elements are found by a best-first search from the
+        roots (see peek_k_smallest), the children of the extracted elements that are
+        not extracted themselves become roots, and then the root list is consolidated.
+
+        :param k: number of elements to extract
+        :return: list of the extracted elements in increasing order of priority
+        """
+        if self._min is None or k <= 0:
+            return []
+
+        extracted, frontier = self._k_smallest(k)
+
+        for z in extracted:
+            self._discard(z)
+            z.child = z.parent = None
+            z.degree = 0
+        self._size -= len(extracted)
+        if self._pool is not None:
+            self._pool.extend(extracted)
+
+        # what is left in the frontier of the search are the roots of the remaining trees
+        self._min = None
+        for _, _, x in frontier:
+            x.left = x.right = x
+            x.mark = False
+            self._insert_to_root_list(x)
+            if x.priority < self._min.priority:
+                self._min = x
+
+        if self._min is not None and self._min.right is not self._min:
+            self._consolidate()
+
+        return extracted
+
+    def peek_k_smallest(self, k):
+        """
+        Non-destructive version of extract_k_min.  Takes O(r + k log(k + r)) time, where
+        r is the number of roots, by exploring the trees best-first with an auxiliary heap.
+
+        :param k: number of elements
+        :return: list of the (at most) k elements with the smallest priorities, in increasing order
+        """
+        if self._min is None or k <= 0:
+            return []
+        return self._k_smallest(k)[0]
+
+    def _k_smallest(self, k):
+        """
+        Best-first search of the forest, starting from the roots and expanding the
+        children of every element taken.
+
+        :return: the (at most) k smallest elements in increasing order, and the frontier
+                 of the search as a list of (priority, tiebreak, element)
+        """
+        frontier = [(x.priority, i, x) for i, x in enumerate(self._min.siblings())]
+        heapq.heapify(frontier)
+        tiebreak = len(frontier)
+
+        smallest = []
+        while frontier and len(smallest) < k:
+            x = heapq.heappop(frontier)[2]
+            smallest.append(x)
+            for child in x.children():
+                heapq.heappush(frontier, (child.priority, tiebreak, child))
+                tiebreak += 1
+
+        return smallest, frontier
+
     def decrease_key(self, x, new_priority):
         """
         Assigns to element x within heap H the new key value k,
@@ -189,6 +327,8 @@ class FibonacciHeap(object):
         :return:
         :raise: ValueError if the new priority is not strictly less than the old priority
         """
+        if self._pool is not None:
+            self._check_live(x)
         if new_priority >= x.priority:
             raise ValueError("Decrease key: new priority value (%d) must "
                              "be less than old priority (%d)!"
@@ -208,6 +348,76 @@ class FibonacciHeap(object):
         if x.priority < self._min.priority:
             self._min = x
 
+    def update_priority(self, x, new_priority):
+        """
+        Change the priority of element x, in either direction.
+        Decreases take the decrease_key path.  On an increase, the children of x
+        are moved to the root list (they may now be smaller than x), x itself is cut
+        from its parent as it lost children, and if x was the minimal element the new
+        minimum is searched among the roots.  This avoids the full extract_min and
+        consolidation that delete followed by insert costs.
+
+        :param x: an reference to the node in the heap
+        :param new_priority: new priority of x
+        :return:
+        """
+        if new_priority < x.priority:
+            self.decrease_key(x, new_priority)
+            return
+        if self._pool is not None:
+            self._check_live(x)
+        if new_priority == x.priority:
+            return
+
+        x.priority = new_priority
+
+        for child in x.children():
+            child.mark = False
+            self._insert_to_root_list(child)
+        x.child = None
+        x.degree = 0
+
+        y = x.parent
+        if y is not None:
+            self._cut(x, y)
+            self._cascading_cut(y)
+
+        if x is self._min:
+            for root in x.siblings():
+                if root.priority < self._min.priority:
+                    self._min = root
+
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several elements at once, e.g. all the neighbors
+        of a vertex in Prim's or Dijkstra's algorithm.  Same as calling decrease_key
+        on each pair, except that the minimal element is only updated once at the end.
+        Pairs whose new priority is not less than the current one are ignored,
+        so an element may appear more than once in the batch.
+
+        :param batch: sequence of (element, new priority) pairs
+        :return:
+        """
+        pooled = self._pool is not None
+        smallest = self._min
+        for x, new_priority in batch:
+            if pooled:
+                self._check_live(x)
+            if not new_priority < x.priority:
+                continue
+
+            x.priority = new_priority
+            y = x.parent
+
+            if y is not None and new_priority < y.priority:
+                self._cut(x, y)
+                self._cascading_cut(y)
+
+            if new_priority < smallest.priority:
+                smallest = x
+
+        self._min = smallest
+
     def delete(self, x):
         """
         Delete element x from heap. To maintain heap invariant, this operation
@@ -238,6 +448,8 @@ class FibonacciHeap(object):
 
         min_one = self._min
         min_two = heap.min()
+        if min_two is None:  # nothing to merge
+            return
 
         if min_one:
             min_one_right = self._min.right
@@ -247,10 +459,16 @@ class FibonacciHeap(object):
                     min_two.right, min_one, min_one_right, min_two
             else:
                 self._insert_to_root_list(min_two)
+            if min_two.priority < min_one.priority:
+                self._min = min_two
         else:
             self._min = min_two
 
         self._size += heap.size()
+        self._dict.update(heap._dict)
+        if self._pool is not None and heap._pool:
+            self._pool.extend(heap._pool)
+            heap._pool = []
         heap._clear()
 
     def __len__(self):
@@ -259,6 +477,15 @@ class FibonacciHeap(object):
         """
         return self.size()
 
+    def _discard(self, z):
+        """
+        Mark extracted node z as out of the heap, and forget it in _dict unless a later
+        insert of the same object took its place there.
+        """
+        z.left = z.right = None
+        if self._dict.get(z.obj) is z:
+            del self._dict[z.obj]
+
     def _insert_to_root_list(self, elem):
         """
         Insert element into the root level of the Fibonacci heap
@@ -312,35 +539,50 @@ class FibonacciHeap(object):
         the consolidation, no two root trees can have the same degree.
         To accomplish this, this operation merges two trees of the same degree (d)
         into 1 tree with degree (d+1) similar to addition in binary.
+
+        The degree table is kept between calls (cleared as it is emptied) and only grows
+        with the heap, and the root list is walked in place, so no list, queue or
+        NumPy scalar is allocated per call.
         :return:
         """
-        array = [None] * int(np.ceil(np.log(self._size)/np.log(golden))+1)
+        # the degree of a node is at most log_phi(n) < 1.4405 * log2(n)
+        table = self._degrees
+        max_degree = int(self._size.bit_length() * 1.4405) + 2
+        if len(table) < max_degree:
+            table.extend([None] * (max_degree - len(table)))
 
-        # enqueue all the root nodes into a queue since their pointers will be overwritten
-        # root list will be empty at the end of the loop
-        q = deque()
-        while self._min:
-            q.append(self._min)
-            self._remove_from_root_list(self._min)
+        # break the circular root list into a chain, since the pointers of the roots will be
+        # overwritten; the root list is empty until the trees are added back at the end
+        x = self._min
+        x.left.right = None
+        self._min = None
+        top = 0
 
-        while len(q):
-            x = q.popleft()
+        while x is not None:
+            next_root = x.right
+            x.left = x.right = x
             d = x.degree
 
-            while array[d] is not None:
-                y = array[d]
-
+            y = table[d]
+            while y is not None:
                 if x.priority > y.priority:
                     # this ensures that the node with the minimal priority will be the parent
                     x, y = y, x
                 self._heap_link(y, x)
-                array[d] = None
+                table[d] = None
                 d += 1
-            array[d] = x
+                y = table[d]
+
+            table[d] = x
+            if d > top:
+                top = d
+            x = next_root
 
-        # add all the new trees from the list back into the root list
-        for elem in array:
+        # add all the new trees from the table back into the root list
+        for d in xrange(top + 1):
+            elem = table[d]
             if elem is not None:
+                table[d] = None
                 if self._min is None:
                     self._min = elem
                 else:
@@ -412,3 +654,206 @@ class FibonacciHeap(object):
         """
         self._min = None
         self._size = 0
+        self._dict = {}
+
+
+def test_merge(n):
+    """Merge heaps of several sizes, an empty one on either side, and drain the result"""
+    ok = True
+    for sizes in [(n, n), (n, 1), (1, n), (n, 0), (0, n), (0, 0)]:
+        heaps = [FibonacciHeap(), FibonacciHeap()]
+        expected = []
+        for i, (heap, size) in enumerate(zip(heaps, sizes)):
+            for j in xrange(size):
+                priority = random.random()
+                heap.insert((i, j), priority)
+                expected.append(((i, j), priority))
+            if size > 1:  # consolidate, so that the heap has several trees
+                heap.insert((i, -1), -1)
+                heap.extract_min()
+        heaps[0].merge(heaps[1])
+        expected.sort(key=lambda x: x[1])
+
+        actual = []
+        while len(heaps[0]):
+            item = heaps[0].extract_min()
+            actual.append((item.obj, item.priority))
+        ok = ok and actual == expected and len(heaps[1]) == 0 and heaps[1].min() is None
+
+    merged = FibonacciHeap()
+    merged.insert('a', 5)
+    smaller = FibonacciHeap()
+    smaller.insert('b', 1)
+    merged.merge(smaller)
+    ok = ok and merged.min().obj == 'b' and len(merged) == 2
+
+    if ok:
+        print "test_merge: working!"
+    else:
+        print "test_merge: wrong extraction order after merge"
+        return False
+
+
+def test_decrease_keys(n):
+    """Batch decrease (with pairs that do not decrease, to be skipped) and drain the heap"""
+    heap = FibonacciHeap()
+    elems = [heap.insert(i, random.random()) for i in xrange(n)]
+    heap.extract_min()  # consolidate, so that decreases cut subtrees
+    elems = [elem for elem in elems if elem.obj in heap]
+    expected = dict((elem.obj, elem.priority) for elem in elems)
+
+    batch = []
+    for elem in random.sample(elems, len(elems) // 2):
+        batch.append((elem, expected[elem.obj] - random.random()))
+        batch.append((elem, expected[elem.obj] + random.random()))
+    random.shuffle(batch)
+    for elem, new_priority in batch:
+        expected[elem.obj] = min(expected[elem.obj], new_priority)
+    heap.decrease_keys(batch)
+
+    actual = []
+    while len(heap):
+        item = heap.extract_min()
+        actual.append((item.obj, item.priority))
+
+    if actual == sorted(expected.items(), key=lambda x: x[1]):
+        print "test_decrease_keys: working!"
+    else:
+        print "test_decrease_keys: wrong extraction order after decrease_keys"
+        return False
+
+
+def test_k_smallest(n):
+    """peek_k_smallest leaves the heap intact, extract_k_min removes the same k elements"""
+    heap = FibonacciHeap()
+    priorities = [random.random() for _ in xrange(n)]
+    for i, priority in enumerate(priorities):
+        heap.insert(i, priority)
+    heap.extract_min()  # consolidate, so that the search goes through the trees
+    expected = sorted(priorities)[1:]
+
+    ok = True
+    for k in [0, 1, 10, n // 3]:
+        peeked = [elem.priority for elem in heap.peek_k_smallest(k)]
+        extracted = [elem.priority for elem in heap.extract_k_min(k)]
+        ok = ok and peeked == extracted == expected[:k]
+        expected = expected[k:]
+    ok = ok and [elem.priority for elem in heap.extract_k_min(n)] == expected and not len(heap)
+
+    if ok:
+        print "test_k_smallest: working!"
+    else:
+        print "test_k_smallest: k smallest differ from sorted()"
+        return False
+
+
+def test_update_priority(n):
+    """Increase and decrease priorities, of roots and of nodes inside trees, and drain the heap"""
+    heap = FibonacciHeap()
+    elems = [heap.insert(i, random.random()) for i in xrange(n)]
+    heap.extract_min()  # consolidate, so that the updated nodes have parents and children
+    elems = [elem for elem in elems if elem.obj in heap]
+    expected = dict((elem.obj, elem.priority) for elem in elems)
+
+    for elem in random.sample(elems, len(elems) // 2):
+        if elem.obj not in heap:  # extracted in between
+            continue
+        new_priority = elem.priority + random.uniform(-1, 1)
+        heap.update_priority(elem, new_priority)
+        expected[elem.obj] = new_priority
+        if random.random() < 0.1:
+            heap.extract_min()  # consolidate again in between
+            del expected[min(expected, key=expected.get)]
+
+    actual = []
+    while len(heap):
+        item = heap.extract_min()
+        actual.append((item.obj, item.priority))
+
+    if actual == sorted(expected.items(), key=lambda x: x[1]):
+        print "test_update_priority: working!"
+    else:
+        print "test_update_priority: wrong extraction order after update_priority"
+        return False
+
+
+def test_pool(n):
+    """Churn a pooled heap against heapq, then check node reuse and stale handle detection"""
+    heap = FibonacciHeap(pool=True)
+    reference = []
+    for i in xrange(n):
+        priority = random.random()
+        heap.insert(i, priority)
+        heapq.heappush(reference, priority)
+
+    ok = True
+    for i in xrange(n, 3 * n):
+        ok = ok and heap.extract_min().priority == heapq.heappop(reference)
+        priority = random.random()
+        heap.insert(i, priority)
+        heapq.heappush(reference, priority)
+
+    x = heap.extract_min()
+    obj, generation = x.obj, x.generation
+    ok = ok and not heap.is_live(x)
+    try:
+        heap.decrease_key(x, -1)
+        ok = False
+    except KeyError:
+        pass
+    y = heap.insert(-1, 0.5)  # reuses the node of x
+    ok = ok and y is x and heap.is_live(y) and not heap.is_live(y, generation) and y.obj != obj
+
+    heapq.heappop(reference)
+    heapq.heappush(reference, 0.5)
+    ok = ok and [heap.extract_min().priority for _ in xrange(len(heap))] == sorted(reference)
+
+    if ok:
+        print "test_pool: working!"
+    else:
+        print "test_pool: pooled heap differs from heapq"
+        return False
+
+
+def test_duplicates(n):
+    """Insert every object twice, on a plain and a pooled heap, and check that all copies come out"""
+    ok = True
+    for heap in (FibonacciHeap(), FibonacciHeap(pool=True)):
+        first, second = [], []
+        for i in xrange(n):
+            first.append(heap.insert(i % 10, random.random() + 1))
+            second.append(heap.insert(i % 10, random.random() + 1))
+        ok = ok and heap[3] is second[n - 7] and len(heap) == 2 * n
+
+        # the handles shadowed in heap[obj] stay usable
+        for x in random.sample(first, n // 2):
+            heap.decrease_key(x, x.priority - 1)
+        for x in random.sample(first, n // 4):
+            if heap.is_live(x):
+                heap.delete(x)
+        expected = sorted(x.priority for x in first + second if heap.is_live(x))
+        ok = ok and len(expected) == len(heap)
+
+        actual = [heap.extract_min().priority for _ in xrange(len(heap))]
+        ok = ok and actual == expected and 3 not in heap and heap.get(3) is None
+
+    heap = FibonacciHeap()
+    heap.insert('a', 1)
+    heap.insert('a', 2)
+    ok = ok and heap.extract_min().priority == 1 and heap['a'].priority == 2
+    ok = ok and heap.extract_min().priority == 2 and 'a' not in heap
+
+    if ok:
+        print "test_duplicates: working!"
+    else:
+        print "test_duplicates: duplicate objects lost or extracted out of order"
+        return False
+
+
+if __name__ == '__main__':
+    test_merge(1000)
+    test_decrease_keys(1000)
+    test_k_smallest(1000)
+    test_update_priority(1000)
+    test_pool(1000)
+    test_duplicates(1000)
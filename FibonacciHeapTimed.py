@@ -9,9 +9,8 @@
 # Copyright:   (c) Di Zhuang 2015
 # -------------------------------------------------------------------------------
 
-from collections import deque
+import heapq
 import numpy as np
-from scipy.constants import golden
 from time import time
 
 
@@ -108,6 +107,7 @@ class FibonacciHeap(object):
         self._size = 0
         self._min = None
         self._dict = {}
+        self._degrees = []  # degree table of _consolidate, reused between calls
 
     @count
     def __getitem__(self, item):
@@ -116,6 +116,19 @@ class FibonacciHeap(object):
         except KeyError:
             raise KeyError("Object %s no longer in heap!" % item)
 
+    @count
+    def __contains__(self, item):
+        return item in self._dict
+
+    @count
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        return self._dict.get(item, default)
+
     @count
     def insert(self, x, priority):
         """
@@ -126,7 +139,8 @@ class FibonacciHeap(object):
 
         O(1) operation.
 
-        :param x: obj associated with priority
+        :param x: obj associated with priority, hashable.  The same object may be inserted
+                  more than once: every insert returns its own node, and heap[x] is the last one
         :param priority: priority of the object
         :return: an reference to the inserted node
         """
@@ -184,10 +198,85 @@ class FibonacciHeap(object):
 
             self._size -= 1
 
-        del self._dict[z.obj]
+            if self._dict.get(z.obj) is z:
+                del self._dict[z.obj]
 
         return z
 
+    @count
+    def extract_k_min(self, k):
+        """
+        Remove the k elements with the smallest priorities (all of them if the heap has
+        fewer) from the heap.  Unlike k calls to extract_min, the heap is consolidated
+        only once: the k smallest elements are found by a best-first search from the
+        roots (see peek_k_smallest), the children of the extracted elements that are
+        not extracted themselves become roots, and then the root list is consolidated.
+
+        :param k: number of elements to extract
+        :return: list of the extracted elements in increasing order of priority
+        """
+        if self._min is None or k <= 0:
+            return []
+
+        extracted, frontier = self._k_smallest(k)
+
+        for z in extracted:
+            if self._dict.get(z.obj) is z:
+                del self._dict[z.obj]
+            z.left = z.right = z
+            z.child = z.parent = None
+            z.degree = 0
+        self._size -= len(extracted)
+
+        # what is left in the frontier of the search are the roots of the remaining trees
+        self._min = None
+        for _, _, x in frontier:
+            x.left = x.right = x
+            x.mark = False
+            self._insert_to_root_list(x)
+            if x.priority < self._min.priority:
+                self._min = x
+
+        if self._min is not None and self._min.right is not self._min:
+            self._consolidate()
+
+        return extracted
+
+    @count
+    def peek_k_smallest(self, k):
+        """
+        Non-destructive version of extract_k_min.  Takes O(r + k log(k + r)) time, where
+        r is the number of roots, by exploring the trees best-first with an auxiliary heap.
+
+        :param k: number of elements
+        :return: list of the (at most) k elements with the smallest priorities, in increasing order
+        """
+        if self._min is None or k <= 0:
+            return []
+        return self._k_smallest(k)[0]
+
+    def _k_smallest(self, k):
+        """
+        Best-first search of the forest, starting from the roots and expanding the
+        children of every element taken.
+
+        :return: the (at most) k smallest elements in increasing order, and the frontier
+                 of the search as a list of (priority, tiebreak, element)
+        """
+        frontier = [(x.priority, i, x) for i, x in enumerate(self._min.siblings())]
+        heapq.heapify(frontier)
+        tiebreak = len(frontier)
+
+        smallest = []
+        while frontier and len(smallest) < k:
+            x = heapq.heappop(frontier)[2]
+            smallest.append(x)
+            for child in x.children():
+                heapq.heappush(frontier, (child.priority, tiebreak, child))
+                tiebreak += 1
+
+        return smallest, frontier
+
     @count
     def decrease_key(self, x, new_priority):
         """
@@ -218,6 +307,73 @@ class FibonacciHeap(object):
         if x.priority < self._min.priority:
             self._min = x
 
+    @count
+    def update_priority(self, x, new_priority):
+        """
+        Change the priority of element x, in either direction.
+        Decreases take the decrease_key path.  On an increase, the children of x
+        are moved to the root list (they may now be smaller than x), x itself is cut
+        from its parent as it lost children, and if x was the minimal element the new
+        minimum is searched among the roots.  This avoids the full extract_min and
+        consolidation that delete followed by insert costs.
+
+        :param x: an reference to the node in the heap
+        :param new_priority: new priority of x
+        :return:
+        """
+        if new_priority < x.priority:
+            self.decrease_key(x, new_priority)
+            return
+        if new_priority == x.priority:
+            return
+
+        x.priority = new_priority
+
+        for child in x.children():
+            child.mark = False
+            self._insert_to_root_list(child)
+        x.child = None
+        x.degree = 0
+
+        y = x.parent
+        if y is not None:
+            self._cut(x, y)
+            self._cascading_cut(y)
+
+        if x is self._min:
+            for root in x.siblings():
+                if root.priority < self._min.priority:
+                    self._min = root
+
+    @count
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several elements at once, e.g. all the neighbors
+        of a vertex in Prim's or Dijkstra's algorithm.  Same as calling decrease_key
+        on each pair, except that the minimal element is only updated once at the end.
+        Pairs whose new priority is not less than the current one are ignored,
+        so an element may appear more than once in the batch.
+
+        :param batch: sequence of (element, new priority) pairs
+        :return:
+        """
+        smallest = self._min
+        for x, new_priority in batch:
+            if not new_priority < x.priority:
+                continue
+
+            x.priority = new_priority
+            y = x.parent
+
+            if y is not None and new_priority < y.priority:
+                self._cut(x, y)
+                self._cascading_cut(y)
+
+            if new_priority < smallest.priority:
+                smallest = x
+
+        self._min = smallest
+
     @count
     def delete(self, x):
         """
@@ -251,6 +407,8 @@ class FibonacciHeap(object):
 
         min_one = self._min
         min_two = heap.min()
+        if min_two is None:  # nothing to merge
+            return
 
         if min_one:
             min_one_right = self._min.right
@@ -260,10 +418,13 @@ class FibonacciHeap(object):
                     min_two.right, min_one, min_one_right, min_two
             else:
                 self._insert_to_root_list(min_two)
+            if min_two.priority < min_one.priority:
+                self._min = min_two
         else:
             self._min = min_two
 
         self._size += heap.size()
+        self._dict.update(heap._dict)
         heap._clear()
 
     @count
@@ -328,39 +489,52 @@ class FibonacciHeap(object):
         the consolidation, no two root trees can have the same degree.
         To accomplish this, this operation merges two trees of the same degree (d)
         into 1 tree with degree (d+1) similar to addition in binary.
+
+        The degree table is kept between calls (cleared as it is emptied) and only grows
+        with the heap, and the root list is walked in place, so no list, queue or
+        NumPy scalar is allocated per call.
         :return:
         """
-        array = [None] * int(np.ceil(np.log(self._size)/np.log(golden)))
+        # the degree of a node is at most log_phi(n) < 1.4405 * log2(n)
+        table = self._degrees
+        max_degree = int(self._size.bit_length() * 1.4405) + 2
+        if len(table) < max_degree:
+            table.extend([None] * (max_degree - len(table)))
 
-        # enqueue all the root nodes into a queue since their pointers will be overwritten
-        # root list will be empty at the end of the loop
-        q = deque()
-        while self._min:
-            q.append(self._min)
-            self._remove_from_root_list(self._min)
+        # break the circular root list into a chain, since the pointers of the roots will be
+        # overwritten; the root list is empty until the trees are added back at the end
+        x = self._min
+        x.left.right = None
+        self._min = None
+        top = 0
 
-        while len(q):
-            x = q.popleft()
+        while x is not None:
+            next_root = x.right
+            x.left = x.right = x
             d = x.degree
 
-            while array[d] is not None:
-                # print d
-                y = array[d]
-
+            y = table[d]
+            while y is not None:
                 if x.priority > y.priority:
                     # this ensures that the node with the minimal priority will be the parent
                     x, y = y, x
                 self._heap_link(y, x)
-                array[d] = None
+                table[d] = None
                 d += 1
+                y = table[d]
 
-            array[d] = x
+            table[d] = x
+            if d > top:
+                top = d
+            x = next_root
 
-        # add all the new trees from the list back into the root list
-        for elem in array:
+        # add all the new trees from the table back into the root list
+        for d in xrange(top + 1):
+            elem = table[d]
             if elem is not None:
+                table[d] = None
                 if self._min is None:
-                    self._insert_to_root_list(elem)
+                    self._min = elem
                 else:
                     self._insert_to_root_list(elem)
                     if elem.priority < self._min.priority:
@@ -434,3 +608,4 @@ class FibonacciHeap(object):
         """
         self._min = None
         self._size = 0
+        self._dict = {}
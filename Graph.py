@@ -11,12 +11,18 @@
 
 import random
 import numpy as np
-from FibonacciHeapTimed import FibonacciHeap, count
+from FibonacciHeapTimed import count
 from time import time
-import MinHeapTimed
-from collections import defaultdict
+import PriorityQueue
+from collections import OrderedDict
+import os
 import pickle
+import shutil
 import sys
+import tempfile
+import MemoryProfile
+from SkipList import SkipList
+from scipy.spatial import cKDTree
 
 
 def timeit(fn):
@@ -121,10 +127,150 @@ class Edge(object):
         return "(%s, %s)" % (self.v_from, self.v_to)
 
 
+def _dedupe_edges(u, v, n):
+    """
+    Drop self loops and duplicate (parallel) edges from the endpoint arrays.
+    Endpoints are normalized so that u < v.
+    """
+    u, v = np.minimum(u, v), np.maximum(u, v)
+    keys = np.unique(u[u != v].astype(np.int64) * n + v[u != v])
+    return keys // n, keys % n
+
+
+def _complete_edges(n, avg_degree, rng):
+    return np.triu_indices(n, 1)
+
+
+def _erdos_renyi_edges(n, avg_degree, rng):
+    """
+    G(n, m) random graph with m = n * avg_degree / 2 edges sampled uniformly.
+    """
+    m = min(int(n * avg_degree // 2), n * (n - 1) // 2)
+    u = v = np.empty(0, dtype=np.int64)
+    while len(u) < m:
+        # oversample a little so that one round is usually enough after deduping
+        k = int((m - len(u)) * 1.1) + 16
+        u, v = _dedupe_edges(np.concatenate([u, rng.randint(0, n, k)]),
+                             np.concatenate([v, rng.randint(0, n, k)]), n)
+    keep = rng.permutation(len(u))[:m]
+    return u[keep], v[keep]
+
+
+def _grid_edges(n, avg_degree, rng):
+    """
+    Road-like graph: a side x side lattice (average degree ~4) with extra short-range
+    edges between nodes at most 2 rows/columns apart until avg_degree is reached.
+    """
+    side = int(np.ceil(np.sqrt(n)))
+    ids = np.arange(n)
+    row, col = ids // side, ids % side
+
+    right = ids[(col < side - 1) & (ids + 1 < n)]
+    down = ids[ids + side < n]
+    u = np.concatenate([right, down])
+    v = np.concatenate([right + 1, down + side])
+
+    m = int(n * avg_degree // 2)
+    for _ in xrange(10):  # clipping at the border and duplicates lose some edges, top up
+        if len(u) >= m:
+            break
+        # oversample so that one round is usually enough after deduping
+        extra = int((m - len(u)) * 1.3) + 16
+        src = rng.randint(0, n, extra)
+        dst_row = np.clip(row[src] + rng.randint(-2, 3, extra), 0, side - 1)
+        dst_col = np.clip(col[src] + rng.randint(-2, 3, extra), 0, side - 1)
+        dst = np.minimum(dst_row * side + dst_col, n - 1)
+        u, v = _dedupe_edges(np.concatenate([u, src]), np.concatenate([v, dst]), n)
+
+    if len(u) > m:
+        keep = rng.permutation(len(u))[:m]
+        u, v = u[keep], v[keep]
+
+    return u, v
+
+
+def _geometric_edges(n, avg_degree, rng):
+    """
+    Random geometric graph: n points in the unit square, connected if closer than r,
+    where r is chosen such that the expected degree is avg_degree.
+    """
+    points = rng.random_sample((n, 2))
+    r = np.sqrt(avg_degree / (n * np.pi))
+    pairs = cKDTree(points).query_pairs(r, output_type='ndarray')
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _power_law_edges(n, avg_degree, rng, exponent=2.5):
+    """
+    Chung-Lu graph whose expected degrees follow a power law with the given exponent.
+    Vertex i has weight (i + 1) ** (-1 / (exponent - 1)); endpoints are drawn
+    proportionally to the weights by inverting the (continuous) cumulative weight.
+    """
+    a = 1.0 - 1.0 / (exponent - 1)
+    m = int(n * avg_degree // 2)
+    scale = (n + 1.0) ** a - 1.0
+    u = (1.0 + rng.random_sample(m) * scale) ** (1.0 / a)
+    v = (1.0 + rng.random_sample(m) * scale) ** (1.0 / a)
+    u = np.minimum(u.astype(np.int64) - 1, n - 1)
+    v = np.minimum(v.astype(np.int64) - 1, n - 1)
+    return _dedupe_edges(u, v, n)
+
+
+GRAPH_FAMILIES = {
+    'complete': _complete_edges,
+    'erdos_renyi': _erdos_renyi_edges,
+    'grid': _grid_edges,
+    'geometric': _geometric_edges,
+    'power_law': _power_law_edges,
+}
+
+
+def generate_edges(family, n, avg_degree=8, seed=None, max_cap=1.0):
+    """
+    Generate the edges of a random graph as NumPy arrays.
+
+    :param family: one of GRAPH_FAMILIES
+    :param n: number of vertices
+    :param avg_degree: average degree of a vertex (ignored for complete graphs)
+    :param seed: seed of the random number generator
+    :param max_cap: edge capacities are drawn uniformly from [0, max_cap)
+    :return: (v_from, v_to, cap) arrays
+    """
+    try:
+        generator = GRAPH_FAMILIES[family]
+    except KeyError:
+        raise ValueError("Unknown graph family %s!" % family)
+
+    rng = np.random.RandomState(seed)
+    v_from, v_to = generator(n, avg_degree, rng)
+    cap = rng.random_sample(len(v_from)) * max_cap
+    return v_from, v_to, cap
+
+
 class UndirectedGraph:
     def __init__(self):
         self.vertices = {}
 
+    def generate(self, family, n, avg_degree=8, seed=None, max_cap=1.0):
+        """
+        Fill the graph with n vertices and the edges of a random graph from the given family.
+        See generate_edges.
+        """
+        self.add_edges(n, *generate_edges(family, n, avg_degree, seed, max_cap))
+
+    def add_edges(self, n, v_from, v_to, cap):
+        """
+        Add n vertices and the edges given as (v_from, v_to, cap) arrays
+        """
+        for i in xrange(n):
+            self.add_vertex(Vertex(i))
+
+        vertices = self.vertices
+        for i, j, c in zip(v_from.tolist(), v_to.tolist(), cap.tolist()):
+            edge = Edge(i, j, c)
+            vertices[i].add_edge(edge)
+            vertices[j].add_edge(edge)
+
     def complete_graph(self, n, max_cap=100):
         for i in xrange(n):
             self.add_vertex(Vertex(i))
@@ -133,6 +279,16 @@ class UndirectedGraph:
             for j in xrange(i+1, n):
                 self.add_edge(Edge(i, j, random.random()))
 
+    def num_vertices(self):
+        return len(self.vertices)
+
+    def adjacent(self, vid):
+        """
+        :return: list of (neighbor id, capacity) pairs of the edges of vertex vid
+        """
+        vertex = self.vertices[vid]
+        return zip(vertex.neighbors(), [e.capacity() for e in vertex.edges()])
+
     def vertices(self):
         """
         Return a list of Nodes in this Graph
@@ -173,115 +329,662 @@ class UndirectedGraph:
             v2.add_edge(edge)
 
 
-def prims_fib(n, DEBUG=False):
-    g = UndirectedGraph()
-    g.complete_graph(n)
-    heap = FibonacciHeap()
+class CompactGraph(object):
+    """
+    Undirected graph in compressed sparse row form: the neighbors of vertex i are
+    indices[indptr[i]:indptr[i+1]] with capacities caps[indptr[i]:indptr[i+1]].
+    Uses three NumPy arrays instead of one Python object per vertex and edge,
+    which is what allows loading graphs with tens of millions of edges.
+    """
 
-    mst = 0
+    def __init__(self, n, indptr, indices, caps):
+        self.n = n
+        self.indptr, self.indices, self.caps = indptr, indices, caps
 
-    for i in xrange(n):
-        heap.insert(g.vertex(i), np.inf)
+    @classmethod
+    def from_edges(cls, n, v_from, v_to, cap):
+        """
+        Build the graph from (v_from, v_to, cap) edge arrays, each edge is stored in both directions
+        """
+        src = np.concatenate([v_from, v_to])
+        order = np.argsort(src, kind='mergesort')
+        indices = np.concatenate([v_to, v_from])[order]
+        caps = np.concatenate([cap, cap])[order]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(n, indptr, indices, caps)
+
+    def num_vertices(self):
+        return self.n
+
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, vid):
+        """
+        :return: array of the ids of the neighbors of vertex vid
+        """
+        return self.indices[self.indptr[vid]:self.indptr[vid+1]]
+
+    def capacities(self, vid):
+        """
+        :return: array of the capacities of the edges of vertex vid, in the order of neighbors(vid)
+        """
+        return self.caps[self.indptr[vid]:self.indptr[vid+1]]
+
+    def adjacent(self, vid):
+        """
+        :return: list of (neighbor id, capacity) pairs of the edges of vertex vid
+        """
+        start, end = self.indptr[vid], self.indptr[vid+1]
+        return zip(self.indices[start:end].tolist(), self.caps[start:end].tolist())
+
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_SHIFTS = np.uint64(30), np.uint64(27), np.uint64(31), np.uint64(11)
+
+
+def _splitmix64(x):
+    """
+    SplitMix64 finalizer applied elementwise to a uint64 array (arithmetic wraps around)
+    """
+    with np.errstate(over='ignore'):
+        z = x + _GOLDEN_GAMMA
+        z = (z ^ (z >> _SHIFTS[0])) * _MIX1
+        z = (z ^ (z >> _SHIFTS[1])) * _MIX2
+        return z ^ (z >> _SHIFTS[2])
+
+
+class ImplicitCompleteGraph(object):
+    """
+    Complete graph whose edges are never stored: the capacity of (i, j) is a hash of
+    the seed and the (unordered) pair, mapped to [0, 1).  Rows of capacities are computed
+    vectorized on demand, so the graph takes O(1) memory instead of O(n^2) Edge objects.
+    """
+
+    def __init__(self, n, seed=0):
+        self.n = n
+        self.seed = seed
+        self._salt = _splitmix64(np.array([seed], dtype=np.uint64))[0]
+
+    def num_vertices(self):
+        return self.n
+
+    def capacities(self, vid, neighbors=None):
+        """
+        :param vid: a vertex id
+        :param neighbors: array of vertex ids (default: all vertices)
+        :return: array of the capacities of the edges between vid and neighbors;
+                 the capacity of (vid, vid) is inf
+        """
+        if neighbors is None:
+            neighbors = np.arange(self.n)
+        neighbors = np.asarray(neighbors, dtype=np.uint64)
+        vid = np.uint64(vid)
+
+        lo, hi = np.minimum(neighbors, vid), np.maximum(neighbors, vid)
+        with np.errstate(over='ignore'):
+            key = (lo * np.uint64(self.n) + hi) ^ self._salt
+        caps = (_splitmix64(key) >> _SHIFTS[3]) * (1.0 / (1 << 53))
+        caps[neighbors == vid] = np.inf
+        return caps
+
+    def adjacent(self, vid):
+        """
+        All n - 1 edges of vid, computed as one row, so that prims_loop works on the
+        implicit graph too (prims_implicit skips the vertices already extracted).
+
+        :return: list of (neighbor id, capacity) pairs of the edges of vertex vid
+        """
+        neighbors = np.arange(self.n)
+        neighbors = neighbors[neighbors != vid]
+        return zip(neighbors.tolist(), self.capacities(vid, neighbors).tolist())
+
+    def edges(self):
+        """
+        Materialize the graph, e.g. for UndirectedGraph.add_edges.
+
+        :return: (v_from, v_to, cap) arrays of all n(n-1)/2 edges
+        """
+        v_from, v_to = np.triu_indices(self.n, 1)
+        cap = np.empty(len(v_from))
+        for i in xrange(self.n - 1):
+            start = i * self.n - i * (i + 1) // 2
+            cap[start:start + self.n - i - 1] = self.capacities(i, v_to[start:start + self.n - i - 1])
+        return v_from, v_to, cap
+
+
+def prims_implicit(g, backend='fibheap'):
+    """
+    Prim's algorithm over an ImplicitCompleteGraph in O(n) memory.  The capacities of
+    the extracted vertex to all vertices still outside the tree are computed as one array,
+    and only the vertices whose key improves reach the heap as decrease key operations.
+
+    :param g: an ImplicitCompleteGraph
+    :param backend: name of a registered heap, see PriorityQueue
+    :return: weight of the minimum spanning tree
+    """
+    n = g.num_vertices()
+    heap = populate(g, PriorityQueue.create(backend))
+
+    key = np.full(n, np.inf)
+    remaining = np.arange(n)
+    mst = 0
 
     while len(heap):
         node = heap.extract_min()
-
         v, w = node.obj, node.priority
 
         if not np.isinf(w):
             mst += w
 
-        for w, e in zip(v.neighbors(), v.edges()):
-            cap = e.capacity()
-            try:
-                elem = heap[g.vertex(w)]
-                if cap < elem.get_priority():
-                    heap.decrease_key(elem, cap)
-            except KeyError:
-                pass
+        remaining = remaining[remaining != v]
+        caps = g.capacities(v, remaining)
+        improved = caps < key[remaining]
+        vertices, caps = remaining[improved], caps[improved]
+        key[vertices] = caps
+
+        for u, cap in zip(vertices.tolist(), caps.tolist()):
+            heap.decrease_key(heap[u], cap)
+
+    return mst
+
+
+def benchmark_implicit(sizes=(1000, 10000, 100000), seed=0):
+    """
+    Time Prim's algorithm with each heap on implicit complete graphs
+    """
+    print '\t'.join(['Vertices'] + PriorityQueue.backends() + ['MST weight'])
+    for n in sizes:
+        g = ImplicitCompleteGraph(n, seed)
+        times = []
+        for backend in PriorityQueue.backends():
+            start = time()
+            mst = prims_implicit(g, backend)
+            times.append(time() - start)
+        print '{:06d}\t{}\t{:0.5f}'.format(n, '\t'.join(['{:0.5f}'.format(t) for t in times]), mst)
+
+
+def test_implicit(sizes=(2, 50, 300), seeds=(0, 1, 2)):
+    """
+    Compare prims_implicit with prims on the same graph materialized from its edges,
+    as an UndirectedGraph and as a CompactGraph
+    """
+    for n in sizes:
+        for seed in seeds:
+            g = ImplicitCompleteGraph(n, seed)
+            undirected = UndirectedGraph()
+            undirected.add_edges(n, *g.edges())
+            compact = CompactGraph.from_edges(n, *g.edges())
+            for backend in PriorityQueue.backends():
+                mst = prims_implicit(g, backend)
+                expected = [prims(undirected, backend), prims(compact, backend)]
+                if not np.allclose(expected, mst):
+                    print "Something is wrong! n=%d seed=%d %s: %s instead of %s" \
+                          % (n, seed, backend, mst, expected)
+                    return False
+    print "It works!"
+
+
+class GraphCache(object):
+    """
+    Cache of generated graphs keyed by the generator parameters (family, n, avg_degree, seed),
+    so that every heap runs on identical inputs and repeated sweeps skip the generation.
+
+    Materialized graphs are kept in memory in least recently used order, evicting the oldest
+    ones once their estimated size exceeds max_bytes.  If a directory is given, the edge arrays
+    are also stored there in the binary edge list format (see GraphIO), so a graph evicted from
+    memory (or generated by an earlier run) only needs to be materialized again.
+    """
+
+    def __init__(self, max_bytes=1 << 30, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._graphs = OrderedDict()  # key -> (graph, estimated bytes)
+        self._bytes = 0
+        self.hits = self.disk_hits = self.misses = 0
+
+    def get(self, family, n, avg_degree=8, seed=0):
+        """
+        :return: the UndirectedGraph generated with the given parameters (see generate_edges)
+        """
+        key = (family, n, avg_degree, seed)
+        try:
+            g, size = self._graphs.pop(key)
+            self._graphs[key] = (g, size)  # move to the most recently used end
+            self.hits += 1
+            return g
+        except KeyError:
+            pass
 
-    if DEBUG:
-        for fn in [heap.insert, heap.extract_min, heap.decrease_key, heap.__getitem__]:
-            print '{}: called = {:d}, avg_time = {:0.5f}, total_time = {:0.5f}'.format\
-                (fn.__name__, fn.called, fn.time / fn.called, fn.time)
+        g = UndirectedGraph()
+        g.add_edges(n, *self.edges(family, n, avg_degree, seed))
+        self._put(key, g)
+        return g
 
-    stats = {}
-    for fn in [heap.insert, heap.extract_min, heap.decrease_key, heap.__getitem__]:
-        stats[fn.__name__] = (fn.called, fn.time)
+    def edges(self, family, n, avg_degree=8, seed=0):
+        """
+        :return: the (v_from, v_to, cap) arrays of the graph, from disk if available
+        """
+        import GraphIO  # GraphIO imports this module
 
-    return stats
+        filename = self._filename(family, n, avg_degree, seed)
+        if filename is not None and os.path.exists(filename):
+            self.disk_hits += 1
+            return GraphIO.read_binary_edges(filename)[1:]
 
+        self.misses += 1
+        edges = generate_edges(family, n, avg_degree, seed)
+        if filename is not None:
+            GraphIO.write_binary(filename, n, *edges)
+        return edges
 
-def prims_minheap(n, DEBUG=False):
-    g = init_graph(n)
-    heap = MinHeapTimed.MinHeap()
+    def clear(self):
+        """
+        Empty the in-memory cache, files on disk are kept
+        """
+        self._graphs.clear()
+        self._bytes = 0
 
-    mst = 0
+    def __len__(self):
+        return len(self._graphs)
 
+    def nbytes(self):
+        """
+        :return: estimated size of the graphs held in memory
+        """
+        return self._bytes
+
+    def _put(self, key, g):
+        size = self._estimate_bytes(g)
+        if size > self.max_bytes:
+            return
+
+        self._graphs[key] = (g, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._graphs.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _filename(self, family, n, avg_degree, seed):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, '{}_{:d}_{}_{}.bin'.format(family, n, avg_degree, seed))
+
+    @staticmethod
+    def _estimate_bytes(g):
+        """
+        Estimate the size of a graph from the size of one vertex and one edge
+        """
+        vertices = g.vertices
+        if not vertices:
+            return sys.getsizeof(vertices)
+        m = sum(len(v.edges()) for v in vertices.itervalues()) // 2
+        vertex = next(vertices.itervalues())
+        size = sys.getsizeof(vertices) + len(vertices) * MemoryProfile.instance_size(vertex)
+        if m:
+            edge = next(v.edges()[0] for v in vertices.itervalues() if v.edges())
+            size += m * MemoryProfile.instance_size(edge)
+        return size
+
+
+def test_cache(n=200, family='grid'):
+    """
+    Fill a GraphCache with room for two graphs, check that the least recently used one
+    is evicted, and that a graph reloaded from disk is identical to the generated one
+    """
+    def edge_list(g):
+        return sorted(set((e.v_from, e.v_to, e.cap) for v in g.vertices.itervalues() for e in v.edges()))
+
+    directory = tempfile.mkdtemp(prefix='graphcache')
+    try:
+        cache = GraphCache(directory=directory)
+        first = cache.get(family, n, seed=0)
+        cache.max_bytes = 2 * cache.nbytes() + cache.nbytes() // 2
+        second = cache.get(family, n, seed=1)
+        ok = cache.get(family, n, seed=0) is first and cache.hits == 1  # seed 1 is now the LRU
+        cache.get(family, n, seed=2)
+        ok = ok and len(cache) == 2 and (family, n, 8, 1) not in cache._graphs and cache.nbytes() <= cache.max_bytes
+        ok = ok and cache.get(family, n, seed=0) is first and cache.hits == 2
+
+        misses = cache.misses
+        reloaded = cache.get(family, n, seed=1)
+        ok = ok and reloaded is not second and cache.disk_hits == 1 and cache.misses == misses
+        ok = ok and edge_list(reloaded) == edge_list(second) and prims(reloaded) == prims(second)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if ok:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def populate(g, heap):
+    """
+    Insert the id of every vertex of g into the heap with an infinite priority
+    """
+    for i in xrange(g.num_vertices()):
+        heap.insert(i, np.inf)
+    return heap
+
+
+# state of a vertex during Prim's algorithm
+UNSEEN, IN_HEAP, EXTRACTED = 0, 1, 2
+
+
+def prims_loop(g, heap, batch=False):
+    """
+    Prim's algorithm over any graph with adjacent(vid) and any heap implementing
+    the priority queue protocol (see PriorityQueue).
+
+    The state of every vertex (unseen, in heap, extracted) is kept in an array,
+    so visiting the neighbors of a vertex needs neither an exception for the
+    already extracted ones nor a heap lookup.  Vertices already in the heap (see
+    populate) are used as is; unseen vertices are inserted when first reached,
+    and a new tree is started from the next unseen vertex when the heap runs empty.
+
+    :param batch: relax all the neighbors of an extracted vertex with one decrease_keys
+                  call instead of one decrease_key call per neighbor.  Off by default:
+                  building the batch costs about what it saves (see benchmark_batch)
+    :return: weight of the minimum spanning forest
+    """
+    n = g.num_vertices()
+    state = bytearray(n)
     for i in xrange(n):
-        heap.push(MinHeapTimed.Element(g.vertex(i), np.inf))
+        if i in heap:
+            state[i] = IN_HEAP
+
+    get, decrease_key, decrease_keys = heap.get, heap.decrease_key, heap.decrease_keys
+    mst = 0
+
+    for root in xrange(n):
+        if state[root] == UNSEEN:
+            heap.insert(root, np.inf)
+            state[root] = IN_HEAP
+
+        while len(heap):
+            node = heap.extract_min()
+
+            v, w = node.obj, node.priority
+            state[v] = EXTRACTED
+
+            if not np.isinf(w):
+                mst += w
+
+            relaxed = []
+            for w, cap in g.adjacent(v):
+                s = state[w]
+                if s == IN_HEAP:
+                    elem = get(w)
+                    if cap < elem.priority:
+                        if batch:
+                            relaxed.append((elem, cap))
+                        else:
+                            decrease_key(elem, cap)
+                elif s == UNSEEN:
+                    heap.insert(w, cap)
+                    state[w] = IN_HEAP
+
+            if relaxed:
+                decrease_keys(relaxed)
+
+    return mst
+
+
+def _prims_loop_keyerror(g, heap):
+    """
+    Prim's loop as it was before the state array: every neighbor is looked up in the
+    heap, and extracted vertices are detected by the KeyError.  Kept for benchmark_membership.
+    """
+    mst = 0
 
     while len(heap):
-        node = heap.pop()
+        node = heap.extract_min()
 
         v, w = node.obj, node.priority
 
         if not np.isinf(w):
             mst += w
 
-        for w, e in zip(v.neighbors(), v.edges()):
-            cap = e.capacity()
+        for w, cap in g.adjacent(v):
             try:
-                elem = heap[g.vertex(w)]
+                elem = heap[w]
                 if cap < elem.get_priority():
                     heap.decrease_key(elem, cap)
             except KeyError:
                 pass
 
+    return mst
+
+
+def benchmark_membership(sizes=(500, 1000, 2000), family='complete', repeat=3):
+    """
+    Time the Prim's loop with the state array against the exception based one,
+    for every heap on the same graphs
+    """
+    cache = GraphCache()
+    print '\t'.join(['Vertices', 'heap', 'KeyError', 'state array', 'speedup'])
+    for n in sizes:
+        g = cache.get(family, n, seed=0)
+        for backend in PriorityQueue.backends():
+            times = []
+            for loop in [_prims_loop_keyerror, prims_loop]:
+                best = np.inf
+                for _ in xrange(repeat):
+                    heap = populate(g, PriorityQueue.create(backend))
+                    start = time()
+                    loop(g, heap)
+                    best = min(best, time() - start)
+                times.append(best)
+            print '{:05d}\t{}\t{:0.5f}\t{:0.5f}\t{:0.2f}x'.format(
+                n, backend, times[0], times[1], times[0] / times[1])
+
+
+def benchmark_batch(sizes=(500, 1000, 2000), family='complete', repeat=3):
+    """
+    Time the Prim's loop relaxing the neighbors with one decrease_keys call per
+    extracted vertex against one decrease_key call per neighbor, on the same graphs
+    """
+    cache = GraphCache()
+    print '\t'.join(['Vertices', 'heap', 'decrease_key', 'decrease_keys', 'speedup'])
+    for n in sizes:
+        g = cache.get(family, n, seed=0)
+        for backend in PriorityQueue.backends():
+            times = []
+            for batch in [False, True]:
+                best = np.inf
+                for _ in xrange(repeat):
+                    heap = populate(g, PriorityQueue.create(backend))
+                    start = time()
+                    prims_loop(g, heap, batch)
+                    best = min(best, time() - start)
+                times.append(best)
+            print '{:05d}\t{}\t{:0.5f}\t{:0.5f}\t{:0.2f}x'.format(
+                n, backend, times[0], times[1], times[0] / times[1])
+
+
+def prims(g, backend='fibheap', lazy=False):
+    """
+    :param g: an UndirectedGraph or a CompactGraph
+    :param backend: name of a registered heap, see PriorityQueue
+    :param lazy: insert vertices when they are first reached instead of all of them upfront
+    :return: weight of the minimum spanning forest
+    """
+    heap = PriorityQueue.create(backend)
+    if not lazy:
+        populate(g, heap)
+    return prims_loop(g, heap)
+
+
+def prims_timed(backend, n, DEBUG=False, family='complete', avg_degree=8, seed=None, cache=None):
+    """
+    Run Prim's algorithm with the timed variant of a heap on a generated graph
+
+    :return: {method name: (number of calls, total time)}
+    """
+    if cache is not None:
+        g = cache.get(family, n, avg_degree, seed)
+    else:
+        g = init_graph(n, family, avg_degree, seed)
+    heap = PriorityQueue.create(backend, timed=True)
+    prims_loop(g, populate(g, heap))
+
+    stats = PriorityQueue.heap_stats(backend, heap)
+
     if DEBUG:
-        for fn in [heap.push, heap.pop, heap.decrease_key, heap.__getitem__]:
+        for name in sorted(stats):
+            called, t = stats[name]
             print '{}: called = {:d}, avg_time = {:0.5f}, total_time = {:0.5f}'.format\
-                (fn.__name__, fn.called, fn.time / fn.called, fn.time)
-
-    stats = {}
-    for fn in [heap.push, heap.pop, heap.decrease_key, heap.__getitem__]:
-        stats[fn.__name__] = (fn.called, fn.time)
+                (name, called, t / called if called else 0.0, t)
 
     return stats
 
+
+def prims_fib(n, DEBUG=False, family='complete', avg_degree=8, seed=None, cache=None):
+    return prims_timed('fibheap', n, DEBUG, family, avg_degree, seed, cache)
+
+
+def prims_minheap(n, DEBUG=False, family='complete', avg_degree=8, seed=None, cache=None):
+    return prims_timed('minheap', n, DEBUG, family, avg_degree, seed, cache)
+
 @count
-def init_graph(n):
+def init_graph(n, family='complete', avg_degree=8, seed=None):
     g = UndirectedGraph()
-    g.complete_graph(n)
+    if family == 'complete' and seed is None:
+        g.complete_graph(n)
+    else:
+        g.generate(family, n, avg_degree, seed)
     return g
 
 
+def populate_skiplist(g, n):
+    skiplist = SkipList()
+    for i in xrange(n):
+        skiplist.insert(random.random(), g.vertex(i))
+    return skiplist
+
+
+def _create_populated(backend, g):
+    return populate(g, PriorityQueue.create(backend))
+
+
+def _prims_phase(g, heap):
+    """
+    Run Prim's loop with heap, returning the heap, so that the memory it still
+    holds afterwards is the steady state of the phase.
+    """
+    prims_loop(g, heap)
+    return heap
+
+
+def memory_profile(n, family='complete', avg_degree=8, seed=None, backends=None):
+    """
+    Measure the peak and steady-state memory (in bytes) of the phases of Prim's
+    algorithm on a graph with n vertices: graph construction, heap population
+    and the Prim's loop for each heap backend.  SkipList has no decrease key operation,
+    so only its population is measured.  Also reports the bytes per Element/Node/Edge.
+
+    :param n: number of vertices
+    :param family: graph family, see generate_edges
+    :param backends: names of the heaps to measure (default: all registered heaps)
+    :return: a dict of {phase: (peak, steady)} plus the per-object sizes, and under 'peak'
+             how peaks were measured ('tracemalloc', or 'rss', see MemoryProfile.measure)
+    """
+    stats = {'peak': 'rss' if MemoryProfile.tracemalloc is None else 'tracemalloc'}
+
+    g, peak, steady = MemoryProfile.measure(init_graph, n, family, avg_degree, seed)
+    stats['graph'] = (peak, steady)
+
+    for backend in (PriorityQueue.backends() if backends is None else backends):
+        heap, peak, steady = MemoryProfile.measure(_create_populated, backend, g)
+        stats[backend + '_populate'] = (peak, steady)
+        stats[backend + '_element'] = MemoryProfile.instance_size(heap[0])
+        _, peak, steady = MemoryProfile.measure(_prims_phase, g, heap)
+        stats[backend + '_prims'] = (peak, steady)
+
+    skiplist, peak, steady = MemoryProfile.measure(populate_skiplist, g, n)
+    stats['skiplist_populate'] = (peak, steady)
+    stats['skiplist_node'] = MemoryProfile.instance_size(skiplist._head.forward[0])
+
+    edge = next(v.edges()[0] for v in g.vertices.itervalues() if v.edges())
+    stats['edge'] = MemoryProfile.instance_size(edge)
+
+    return stats
+
+
+def _backends(stat):
+    """
+    :return: names of the heaps in a trial (results from before the registry only have two)
+    """
+    return stat.get('backends', ['fibheap', 'minheap'])
+
+
+def _timed_backends(stat):
+    """
+    :return: names of the heaps in a trial that have timings, so that the columns line up
+    """
+    return [backend for backend in _backends(stat) if stat[backend]]
+
+
+def _label(stat):
+    """
+    :return: the row label of a trial, the graph family (if any) and the number of vertices
+    """
+    if 'family' in stat:
+        return '{}:{:05d}\t'.format(stat['family'], stat['vertices'])
+    return '{:05d}\t'.format(stat['vertices'])
+
+
+def print_memory(filename):
+    with open(filename, 'rb') as f:
+        result = pickle.load(f)
+
+    names = _backends(next(stat for stat in result if 'memory' in stat))
+    phases = ['graph'] + [name + phase for name in names for phase in ['_populate', '_prims']]
+    phases.append('skiplist_populate')
+    sizes = [name + '_element' for name in names] + ['skiplist_node', 'edge']
+
+    print 'Vertices\t\t\tPeak / Steady (KB)\t\t\tBytes per object'
+    print '\t'.join([''] + phases + sizes)
+
+    for stat in result:
+        if 'memory' not in stat:
+            continue
+        print _label(stat),
+        memory = stat['memory']
+        row = ['{:0.1f}/{:0.1f}'.format(memory[p][0] / 1024.0, memory[p][1] / 1024.0)
+               for p in phases]
+        row.extend(['{:d}'.format(memory[s]) for s in sizes])
+        print '\t'.join(row)
+
+    if any(stat['memory'].get('peak', 'rss') == 'rss' for stat in result if 'memory' in stat):
+        print 'Peak is an RSS approximation (no tracemalloc): the rise of the RSS high water mark, ' \
+              'at least the steady size'
+
+
 def print_results(filename):
     with open(filename, 'rb') as f:
         result = pickle.load(f)
 
-    print 'Vertices\t\t\tFibonacci Heap\t\t\tMin Heap'
+    backends = _timed_backends(result[0])
+    print '\t\t\t'.join(['Vertices'] + backends)
     names = ['']
-    names.extend(sorted(result[0]['fibheap']))
-    names.extend(sorted(result[0]['minheap']))
+    for backend in backends:
+        names.extend(sorted(result[0][backend]))
     print '\t'.join(names)
 
     for stat in result:
-        print '{:05d}\t'.format(stat['vertices']),
+        print _label(stat),
 
         avg_times = []
-        for fn in sorted(stat['fibheap']):
-            called, total_time = [sum(x) for x in zip(*stat['fibheap'][fn])]
-            fn_avg_time = float(total_time) / called
-            avg_times.append(fn_avg_time)
-        sys.stdout.write('\t'.join(['{:0.5f}'.format(val) for val in avg_times]))
-        sys.stdout.write('\t')
-
-        avg_times = []
-        for fn in sorted(stat['minheap']):
-            called, total_time = [sum(x) for x in zip(*stat['minheap'][fn])]
-            fn_avg_time = float(total_time) / called
-            avg_times.append(fn_avg_time)
+        for backend in backends:
+            for fn in sorted(stat[backend]):
+                called, total_time = [sum(x) for x in zip(*stat[backend][fn])]
+                fn_avg_time = float(total_time) / called if called else 0.0
+                avg_times.append(fn_avg_time)
         print '\t'.join(['{:0.5f}'.format(val) for val in avg_times])
 
 
@@ -289,61 +992,68 @@ def summarize(filename):
     with open(filename, 'rb') as f:
         result = pickle.load(f)
 
-    print 'Vertices\t\t\tFibonacci Heap\t\t\tMin Heap'
+    backends = _timed_backends(result[0])
+    print '\t\t\t'.join(['Vertices'] + backends)
     names = ['']
-    names.extend(sorted(result[0]['fibheap']))
-    names.extend(sorted(result[0]['minheap']))
+    for backend in backends:
+        names.extend(sorted(result[0][backend]))
     print '\tcalled\t'.join(names)
 
     for stat in result:
-        print '{:05d}\t'.format(stat['vertices']),
-
-        avg_times = []
-        for fn in sorted(stat['fibheap']):
-            called, total_time = [sum(x) for x in zip(*stat['fibheap'][fn])]
-            avg_times.append(called)
-            avg_times.append(total_time)
-        sys.stdout.write('\t'.join(['{:0.5f}'.format(val) for val in avg_times]))
-        sys.stdout.write('\t')
+        print _label(stat),
 
         avg_times = []
-        for fn in sorted(stat['minheap']):
-            called, total_time = [sum(x) for x in zip(*stat['minheap'][fn])]
-            avg_times.append(called)
-            avg_times.append(total_time)
+        for backend in backends:
+            for fn in sorted(stat[backend]):
+                called, total_time = [sum(x) for x in zip(*stat[backend][fn])]
+                avg_times.append(called)
+                avg_times.append(total_time)
         print '\t'.join(['{:0.5f}'.format(val) for val in avg_times])
 
 
-def run_trials(trials=10, repeat=10):
-    result = [None] * trials
-    for i in xrange(trials):
-        num = (i + 1) * 10
-        result[i] = {}
-        result[i]['vertices'] = num
-        result[i]['fibheap'] = {}
-        result[i]['minheap'] = {}
-
-        for j in xrange(repeat):
-            stats = prims_fib(num)
-            for fn in stats:
-                try:
-                    result[i]['fibheap'][fn].append(stats[fn])
-                except KeyError:
-                    result[i]['fibheap'][fn] = [stats[fn]]
-
-            stats = prims_minheap(num)
-            for fn in stats:
-                try:
-                    result[i]['minheap'][fn].append(stats[fn])
-                except KeyError:
-                    result[i]['minheap'][fn] = [stats[fn]]
+def run_trials(trials=10, repeat=10, memory=False, families=('complete',), avg_degree=8,
+               cache=None, backends=None):
+    if cache is None:
+        cache = GraphCache()
+    if backends is None:
+        backends = [b for b in PriorityQueue.backends() if PriorityQueue.has_timed(b)]
+
+    result = []
+    for family in families:
+        for i in xrange(trials):
+            num = (i + 1) * 10
+            stat = {}
+            stat['family'] = family
+            stat['vertices'] = num
+            stat['backends'] = list(backends)
+            for backend in backends:
+                stat[backend] = {}
+
+            for j in xrange(repeat):
+                for backend in backends:
+                    stats = prims_timed(backend, num, family=family, avg_degree=avg_degree,
+                                        seed=j, cache=cache)
+                    for fn in stats:
+                        try:
+                            stat[backend][fn].append(stats[fn])
+                        except KeyError:
+                            stat[backend][fn] = [stats[fn]]
+
+            if memory:
+                stat['memory'] = memory_profile(num, family, avg_degree, backends=backends)
+
+            result.append(stat)
 
     with open('FibTrialResults.pickle', 'wb') as f:
         pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
 
     print_results('FibTrialResults.pickle')
+    if memory:
+        print_memory('FibTrialResults.pickle')
 
 
 if __name__ == '__main__':
+    test_implicit()
+    test_cache()
     #  run_trials(3, 1)
     summarize('FibTrialResults.pickle')
@@ -0,0 +1,248 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        GraphIO
+# Purpose:     Load edge-list files into a CompactGraph
+#              Text edge lists are parsed in chunks straight out of a memory map,
+#              and a compact binary format allows fast (zero-copy) reloads
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import mmap
+import os
+import struct
+import tempfile
+from time import time
+import numpy as np
+from Graph import CompactGraph, generate_edges
+
+# binary edge list: header, then m vertex ids (from), m vertex ids (to), m capacities
+MAGIC = 'EDGELST1'
+HEADER = struct.Struct('<8sqq')  # magic, number of vertices, number of edges
+ID_DTYPE = np.dtype('<i4')
+CAP_DTYPE = np.dtype('<f8')
+MAX_ID = np.iinfo(ID_DTYPE).max
+
+
+def _check_ids(ids, filename):
+    """
+    :raise: ValueError if a vertex id does not fit in ID_DTYPE (0 <= id < 2^31)
+    """
+    if len(ids) and (ids.min() < 0 or ids.max() > MAX_ID):
+        raise ValueError("%s: vertex ids must be in [0, %d]!" % (filename, MAX_ID))
+
+
+def write_binary(filename, n, v_from, v_to, cap):
+    """
+    Write the edges into the compact binary format
+
+    :param filename: output file
+    :param n: number of vertices
+    :param v_from, v_to, cap: edge arrays
+    :return: number of bytes written
+    :raise: ValueError if a vertex id does not fit in 32 bits
+    """
+    v_from, v_to = np.asarray(v_from), np.asarray(v_to)
+    _check_ids(v_from, filename)
+    _check_ids(v_to, filename)
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, n, len(v_from)))
+        f.write(np.asarray(v_from, dtype=ID_DTYPE).tostring())
+        f.write(np.asarray(v_to, dtype=ID_DTYPE).tostring())
+        f.write(np.asarray(cap, dtype=CAP_DTYPE).tostring())
+        return f.tell()
+
+
+def write_text(filename, v_from, v_to, cap):
+    """
+    Write the edges as a text edge list, one "v_from v_to cap" line per edge
+    """
+    np.savetxt(filename, np.column_stack([v_from, v_to, cap]), fmt='%d %d %.17g')
+
+
+def read_binary_edges(filename):
+    """
+    Memory-map a binary edge list.  The returned arrays are views on the mapping,
+    so nothing is copied until they are used.
+
+    :return: (n, v_from, v_to, cap)
+    """
+    with open(filename, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, n, m = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError("%s is not a binary edge list!" % filename)
+
+    offset = HEADER.size
+    v_from = np.frombuffer(mm, dtype=ID_DTYPE, count=m, offset=offset)
+    offset += m * ID_DTYPE.itemsize
+    v_to = np.frombuffer(mm, dtype=ID_DTYPE, count=m, offset=offset)
+    offset += m * ID_DTYPE.itemsize
+    cap = np.frombuffer(mm, dtype=CAP_DTYPE, count=m, offset=offset)
+    return n, v_from, v_to, cap
+
+
+def read_text_edges(filename, chunk_size=1 << 24, weighted=True):
+    """
+    Parse a whitespace separated edge list ("v_from v_to [cap]" per line) by memory
+    mapping the file and handing chunks of complete lines to NumPy's C parser, so no
+    Python object is created per line.  Every chunk is copied into int32/float64 edge
+    arrays preallocated from the edge density of the first chunk, so only one chunk
+    is held as float64 at a time.  Leading comment lines starting with '#' are
+    skipped.  Unweighted edge lists get a capacity of 1.
+
+    :param filename: input file
+    :param chunk_size: approximate number of bytes parsed at once
+    :param weighted: whether lines have a third (capacity) column
+    :return: (n, v_from, v_to, cap)
+    :raise: ValueError if a vertex id does not fit in 32 bits
+    """
+    columns = 3 if weighted else 2
+    v_from, v_to = np.empty(0, ID_DTYPE), np.empty(0, ID_DTYPE)
+    cap = np.empty(0, CAP_DTYPE)
+    m = 0
+
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, v_from, v_to, cap
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    start = 0
+    while mm[start:start+1] == '#':
+        start = mm.find('\n', start) + 1
+        if start == 0:
+            start = len(mm)
+
+    while start < len(mm):
+        end = min(start + chunk_size, len(mm))
+        if end < len(mm):
+            # cut the chunk at the last complete line
+            end = mm.rfind('\n', start, end) + 1
+            if end == 0:
+                end = mm.find('\n', start + chunk_size)
+                end = len(mm) if end == -1 else end + 1
+
+        data = np.fromstring(mm[start:end], sep=' ').reshape(-1, columns)
+        _check_ids(data[:, :2], filename)
+        if m + len(data) > len(v_from):
+            # the first chunk sizes the arrays for the whole file, later ones grow them by 1/4
+            estimate = len(data) * (len(mm) - start) // (end - start) + 1 if m == 0 else 0
+            size = max(m + len(data), estimate, len(v_from) + len(v_from) // 4)
+            for array in (v_from, v_to, cap):
+                array.resize(size, refcheck=False)
+
+        v_from[m:m + len(data)] = data[:, 0]
+        v_to[m:m + len(data)] = data[:, 1]
+        if weighted:
+            cap[m:m + len(data)] = data[:, 2]
+        m += len(data)
+        start = end
+
+    mm.close()
+
+    for array in (v_from, v_to, cap):
+        array.resize(m, refcheck=False)
+    if not weighted:
+        cap[:] = 1
+    n = int(max(v_from.max(), v_to.max())) + 1 if m else 0
+    return n, v_from, v_to, cap
+
+
+def load_binary(filename):
+    """
+    :return: a CompactGraph loaded from a binary edge list
+    """
+    return CompactGraph.from_edges(*read_binary_edges(filename))
+
+
+def load_text(filename, chunk_size=1 << 24, weighted=True):
+    """
+    :return: a CompactGraph loaded from a text edge list, see read_text_edges
+    """
+    return CompactGraph.from_edges(*read_text_edges(filename, chunk_size, weighted))
+
+
+def test_round_trip(n=2000, avg_degree=8, family='erdos_renyi'):
+    """
+    Write a graph in both formats and load it back: both must give the generated edges and
+    MST weight.  The text file is parsed in small chunks so that the arrays have to grow.
+    Ids of 2^31 and above must be rejected by both writers and by the text reader.
+    """
+    import Graph
+
+    def edge_list(g):
+        return sorted((u, v, c) for u in xrange(g.num_vertices())
+                      for v, c in g.adjacent(u) if u < v)
+
+    v_from, v_to, cap = generate_edges(family, n, avg_degree, seed=0)
+    expected = CompactGraph.from_edges(n, v_from, v_to, cap)
+    mst = Graph.prims(expected)
+
+    directory = tempfile.mkdtemp()
+    text_file = os.path.join(directory, 'edges.txt')
+    binary_file = os.path.join(directory, 'edges.bin')
+    ok = True
+    try:
+        write_text(text_file, v_from, v_to, cap)
+        write_binary(binary_file, n, v_from, v_to, cap)
+        for g in [load_binary(binary_file), load_text(text_file, chunk_size=4096)]:
+            ok = ok and g.num_edges() == len(v_from) and edge_list(g) == edge_list(expected)
+            ok = ok and Graph.prims(g) == mst
+
+        big = np.array([0, MAX_ID + 1])
+        write_text(text_file, big, big, big)
+        for fn in [lambda: write_binary(binary_file, n, big, big, big),
+                   lambda: read_text_edges(text_file)]:
+            try:
+                fn()
+                ok = False
+            except ValueError:
+                pass
+    finally:
+        for filename in [text_file, binary_file]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+
+    if ok:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark_load(n=100000, avg_degree=20, family='erdos_renyi'):
+    """
+    Measure the load throughput (edges per second) of text and binary edge lists.
+    """
+    v_from, v_to, cap = generate_edges(family, n, avg_degree, seed=0)
+    m = len(v_from)
+
+    directory = tempfile.mkdtemp()
+    text_file = os.path.join(directory, 'edges.txt')
+    binary_file = os.path.join(directory, 'edges.bin')
+
+    try:
+        write_text(text_file, v_from, v_to, cap)
+        write_binary(binary_file, n, v_from, v_to, cap)
+
+        for name, loader, filename in [('text', load_text, text_file),
+                                       ('binary', load_binary, binary_file)]:
+            start = time()
+            g = loader(filename)
+            t = time() - start
+            assert g.num_edges() == m, "Loaded graph has the wrong number of edges!"
+            print '{}: {:d} edges, {:0.5f} secs, {:0.0f} edges/sec, {:d} bytes on disk'.format(
+                name, m, t, m / t, os.path.getsize(filename))
+    finally:
+        for filename in [text_file, binary_file]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    test_round_trip()
+    benchmark_load()
@@ -0,0 +1,241 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        HeapTrace
+# Purpose:     Record the heap operations of Prim's algorithm (or any other user)
+#              into a compact binary trace, and replay a trace against a heap
+#              to time the heap alone, without the graph and loop overhead
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+from array import array
+from itertools import izip
+import struct
+from time import time
+import numpy as np
+import Graph
+import PriorityQueue
+
+INSERT, EXTRACT_MIN, DECREASE_KEY, DELETE, UPDATE_PRIORITY = range(5)
+OP_NAMES = ['insert', 'extract_min', 'decrease_key', 'delete', 'update_priority']
+
+# trace file: header, then the ops (uint8), object ids (int64) and priorities (float64) columns
+MAGIC = 'HEAPTRC1'
+HEADER = struct.Struct('<8sq')  # magic, number of operations
+
+
+class HeapTrace(object):
+    """
+    A sequence of heap operations stored column-wise.
+
+    self.ops: operation codes (INSERT, EXTRACT_MIN, DECREASE_KEY, DELETE, UPDATE_PRIORITY)
+    self.ids: integer id of the object the operation applies to; for EXTRACT_MIN the
+              object extracted when the trace was recorded (-1 if unknown)
+    self.priorities: new priority of the object (nan if not applicable)
+    """
+
+    def __init__(self):
+        self.ops = array('B')
+        self.ids = array('l')
+        self.priorities = array('d')
+
+    def append(self, op, obj_id=-1, priority=np.nan):
+        self.ops.append(op)
+        self.ids.append(obj_id)
+        self.priorities.append(priority)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def counts(self):
+        """
+        :return: {operation name: number of times it occurs in the trace}
+        """
+        counts = np.bincount(np.frombuffer(self.ops, dtype=np.uint8), minlength=len(OP_NAMES))
+        return dict(zip(OP_NAMES, counts.tolist()))
+
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self)))
+            f.write(np.frombuffer(self.ops, dtype=np.uint8).tostring())
+            f.write(np.frombuffer(self.ids, dtype=np.int_).astype('<i8').tostring())
+            f.write(np.frombuffer(self.priorities, dtype=np.float64).astype('<f8').tostring())
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            magic, m = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("%s is not a heap trace!" % filename)
+            trace = cls()
+            trace.ops.fromstring(f.read(m))
+            ids = np.fromfile(f, dtype='<i8', count=m)
+            priorities = np.fromfile(f, dtype='<f8', count=m)
+            trace.ids.fromstring(ids.astype(np.int_).tostring())
+            trace.priorities.fromstring(priorities.astype(np.float64).tostring())
+        return trace
+
+
+class HeapRecorder(object):
+    """
+    Wraps a heap implementing the priority queue protocol (see PriorityQueue)
+    and records the operations called on it.  Objects are numbered in the order
+    they are first inserted.
+    """
+
+    def __init__(self, heap, trace=None):
+        self._heap = heap
+        self._ids = {}
+        self.trace = trace if trace is not None else HeapTrace()
+
+    def _id(self, obj):
+        try:
+            return self._ids[obj]
+        except KeyError:
+            self._ids[obj] = obj_id = len(self._ids)
+            return obj_id
+
+    def insert(self, x, priority):
+        self.trace.append(INSERT, self._id(x), priority)
+        return self._heap.insert(x, priority)
+
+    def extract_min(self):
+        z = self._heap.extract_min()
+        self.trace.append(EXTRACT_MIN, self._id(z.obj))
+        return z
+
+    def extract_k_min(self, k):
+        return [self.extract_min() for _ in xrange(min(k, len(self)))]
+
+    def peek_k_smallest(self, k):
+        return self._heap.peek_k_smallest(k)
+
+    def decrease_key(self, x, new_priority):
+        self.trace.append(DECREASE_KEY, self._id(x.obj), new_priority)
+        return self._heap.decrease_key(x, new_priority)
+
+    def decrease_keys(self, batch):
+        for x, new_priority in batch:
+            if new_priority < x.priority:
+                self.decrease_key(x, new_priority)
+
+    def update_priority(self, x, new_priority):
+        self.trace.append(UPDATE_PRIORITY, self._id(x.obj), new_priority)
+        return self._heap.update_priority(x, new_priority)
+
+    def delete(self, x):
+        self.trace.append(DELETE, self._id(x.obj))
+        return self._heap.delete(x)
+
+    def __getitem__(self, item):
+        return self._heap[item]
+
+    def __contains__(self, item):
+        return item in self._heap
+
+    def get(self, item, default=None):
+        return self._heap.get(item, default)
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def record_prims(n, backend='fibheap', family='complete', avg_degree=8, seed=0):
+    """
+    Record the heap operations of Prim's algorithm on a generated graph
+
+    :param backend: name of the heap Prim's algorithm runs on, see PriorityQueue
+    :return: a HeapTrace
+    """
+    g = Graph.init_graph(n, family, avg_degree, seed)
+    heap = HeapRecorder(PriorityQueue.create(backend))
+    Graph.prims_loop(g, Graph.populate(g, heap))
+    return heap.trace
+
+
+class Replayer(object):
+    """
+    Drives a heap with the operations of one or more traces.
+    The handles of the inserted objects are kept between calls to replay,
+    so a long stream can be replayed chunk by chunk.
+
+    Heaps break ties between equal priorities differently, so the heap may extract
+    another object than the one recorded, with the same priority.  The two are then
+    interchangeable: the handle of the recorded object, still in the heap, stands for
+    the extracted one from then on (self.names maps its obj to the id it stands for).
+    """
+
+    def __init__(self, backend):
+        self.heap = PriorityQueue.create(backend)
+        self.handles = {}  # trace id -> handle
+        self.names = {}  # handle obj -> trace id, where they differ
+
+    def replay(self, trace):
+        insert, extract_min, decrease_key, delete, update_priority = \
+            self.heap.insert, self.heap.extract_min, self.heap.decrease_key, self.heap.delete, \
+            self.heap.update_priority
+        handles, names = self.handles, self.names
+
+        for op, obj_id, priority in izip(trace.ops, trace.ids, trace.priorities):
+            if op == DECREASE_KEY:
+                decrease_key(handles[obj_id], priority)
+            elif op == EXTRACT_MIN:
+                z = extract_min()
+                extracted = names.pop(z.obj, z.obj) if names else z.obj
+                if extracted == obj_id or obj_id < 0:
+                    del handles[extracted]
+                else:
+                    recorded = handles.pop(obj_id)
+                    if recorded.priority != z.priority:
+                        raise ValueError("Replay: extracted %s (%s) instead of %s (%s)!"
+                                         % (extracted, z.priority, obj_id, recorded.priority))
+                    handles[extracted] = recorded
+                    names[recorded.obj] = extracted
+            elif op == INSERT:
+                handles[obj_id] = insert(obj_id, priority)
+            elif op == UPDATE_PRIORITY:
+                update_priority(handles[obj_id], priority)
+            else:
+                delete(handles.pop(obj_id))
+
+
+def benchmark_replay(trace, repeat=3):
+    """
+    Replay the trace against every registered heap and report the best time of each
+    """
+    print '{:d} operations: {}'.format(len(trace), trace.counts())
+    for name in PriorityQueue.backends():
+        best = np.inf
+        for _ in xrange(repeat):
+            start = time()
+            Replayer(name).replay(trace)
+            best = min(best, time() - start)
+        print '{}: {:0.5f} secs, {:0.0f} ops/sec'.format(name, best, len(trace) / best)
+
+
+def test_replay(n=2000, avg_degree=2):
+    """
+    Record Prim's algorithm on every backend and replay each trace on every backend.
+    Sparse graphs leave many vertices at priority inf, whose ties every heap breaks
+    differently; the replay must still drain the heap.
+    """
+    ok = True
+    for family in ['erdos_renyi', 'grid', 'power_law']:
+        for recorded in PriorityQueue.backends():
+            trace = record_prims(n, recorded, family, avg_degree)
+            for name in PriorityQueue.backends():
+                replayer = Replayer(name)
+                replayer.replay(trace)
+                ok = ok and not len(replayer.heap) and not replayer.handles
+
+    if ok:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+if __name__ == '__main__':
+    test_replay()
+    benchmark_replay(record_prims(1000))
@@ -0,0 +1,448 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        HeapWorkload
+# Purpose:     Generate synthetic heap operation streams with a given mix of
+#              insert / extract_min / decrease_key operations and priority
+#              distribution, and benchmark every registered heap against them
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import heapq
+from collections import deque
+from time import time
+import numpy as np
+from scipy.constants import golden
+from HeapTrace import HeapTrace, Replayer, INSERT, EXTRACT_MIN, DECREASE_KEY
+import PriorityQueue
+import FibonacciHeap
+import MinHeap
+
+
+def _draw_keys(rng, distribution, size):
+    if distribution == 'uniform':
+        return rng.random_sample(size)
+    elif distribution == 'exponential':
+        return rng.exponential(1.0, size)
+    elif distribution == 'normal':
+        return np.abs(rng.normal(0.0, 1.0, size))
+    elif distribution == 'pareto':
+        return rng.pareto(1.5, size)
+    raise ValueError("Unknown key distribution %s!" % distribution)
+
+
+def generate_workload(ops, ratios=(1, 1, 1), keys='uniform', decrease='random',
+                      prefill=0, drain=False, chunk_size=1 << 16, seed=None):
+    """
+    Lazily generate a stream of heap operations, one HeapTrace of (at most) chunk_size
+    operations at a time, so only the chunk and the simulated heap are ever in memory.
+
+    The generator simulates the heap (with heapq and lazy deletion) to only emit valid
+    operations: extract_min and decrease_key on an empty heap become inserts.
+
+    :param ops: number of operations after the prefill
+    :param ratios: relative frequencies of (insert, extract_min, decrease_key)
+    :param keys: distribution of the inserted priorities:
+                 'uniform', 'exponential', 'normal' or 'pareto'
+    :param decrease: 'random' lowers the priority of a random item by a random amount,
+                     'monotone' never lowers it below the last extracted priority
+                     (and inserts above it), as in Dijkstra's algorithm
+    :param prefill: number of inserts before the mix starts (initial heap size)
+    :param drain: extract all remaining items at the end
+    :param chunk_size: number of operations per yielded HeapTrace
+    :param seed: seed of the random number generator
+    :return: an iterator of HeapTraces
+    """
+    rng = np.random.RandomState(seed)
+    p = np.asarray(ratios, dtype=float) / sum(ratios)
+    monotone = decrease == 'monotone'
+    if decrease not in ('random', 'monotone'):
+        raise ValueError("Unknown decrease mode %s!" % decrease)
+
+    priority = {}  # live id -> current priority
+    live = []  # live ids, for picking a random one in O(1)
+    position = {}  # live id -> index in live
+    queue = []  # heapq of (priority, id), with stale entries
+    state = {'next_id': 0, 'last_min': 0.0}
+
+    def insert(trace, key):
+        obj_id = state['next_id']
+        state['next_id'] += 1
+        if monotone:
+            key += state['last_min']
+        priority[obj_id] = key
+        position[obj_id] = len(live)
+        live.append(obj_id)
+        heapq.heappush(queue, (key, obj_id))
+        trace.append(INSERT, obj_id, key)
+
+    def extract_min(trace):
+        while True:
+            key, obj_id = heapq.heappop(queue)
+            if priority.get(obj_id) == key:
+                break
+        del priority[obj_id]
+        last = live.pop()
+        if last != obj_id:
+            live[position[obj_id]] = last
+            position[last] = position[obj_id]
+        del position[obj_id]
+        state['last_min'] = key
+        trace.append(EXTRACT_MIN, obj_id)
+
+    def decrease_key(trace, target, fraction):
+        obj_id = live[int(target * len(live))]
+        old = priority[obj_id]
+        if monotone:
+            key = state['last_min'] + (old - state['last_min']) * fraction
+        else:
+            key = old - rng.exponential(0.1)
+        if key < old:
+            priority[obj_id] = key
+            heapq.heappush(queue, (key, obj_id))
+            trace.append(DECREASE_KEY, obj_id, key)
+
+    trace = HeapTrace()
+    for key in _draw_keys(rng, keys, prefill).tolist():
+        insert(trace, key)
+        if len(trace) == chunk_size:
+            yield trace
+            trace = HeapTrace()
+
+    remaining = ops
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        choices = rng.choice(3, size, p=p).tolist()
+        new_keys = _draw_keys(rng, keys, size).tolist()
+        # independent draws for which item is decreased and by how much
+        targets = rng.random_sample(size).tolist()
+        fractions = rng.random_sample(size).tolist()
+
+        for choice, key, target, fraction in zip(choices, new_keys, targets, fractions):
+            if choice == 0 or not live:
+                insert(trace, key)
+            elif choice == 1:
+                extract_min(trace)
+            else:
+                decrease_key(trace, target, fraction)
+
+        yield trace
+        trace = HeapTrace()
+
+    if drain:
+        while live:
+            extract_min(trace)
+            if len(trace) == chunk_size:
+                yield trace
+                trace = HeapTrace()
+
+    if len(trace):
+        yield trace
+
+
+WORKLOADS = {
+    'balanced': dict(ratios=(1, 1, 1), prefill=10000),
+    'insert_heavy': dict(ratios=(4, 1, 1), drain=True),
+    'extract_heavy': dict(ratios=(1, 4, 1), prefill=100000),
+    'decrease_heavy': dict(ratios=(1, 1, 8), prefill=10000),
+    'dijkstra_like': dict(ratios=(1, 1, 4), decrease='monotone', prefill=10000, drain=True),
+    'heavy_tailed': dict(ratios=(1, 1, 2), keys='pareto', prefill=10000),
+}
+
+
+def run_workload(name, backend, ops=10 ** 5, seed=0, **params):
+    """
+    Replay a workload chunk by chunk against one heap backend (see PriorityQueue).
+    Only the replay is timed, not the generation of the chunks.
+
+    :return: (number of operations, secs)
+    """
+    options = dict(WORKLOADS[name])
+    options.update(params)
+
+    replayer = Replayer(backend)
+    count, elapsed = 0, 0.0
+    for trace in generate_workload(ops, seed=seed, **options):
+        start = time()
+        replayer.replay(trace)
+        elapsed += time() - start
+        count += len(trace)
+
+    return count, elapsed
+
+
+def benchmark_workloads(ops=10 ** 5, workloads=None, heaps=None, seed=0):
+    """
+    Run every workload against every heap registered in PriorityQueue and
+    print the throughput matrix (operations per second).
+
+    :return: {workload: {heap: ops/sec}}
+    """
+    workloads = sorted(WORKLOADS) if workloads is None else workloads
+    heaps = PriorityQueue.backends() if heaps is None else heaps
+
+    matrix = {}
+    print '\t'.join(['workload'] + heaps)
+    for name in workloads:
+        matrix[name] = {}
+        for heap in heaps:
+            count, elapsed = run_workload(name, heap, ops, seed)
+            matrix[name][heap] = count / elapsed
+        print '\t'.join([name] + ['{:0.0f}'.format(matrix[name][heap]) for heap in heaps])
+
+    return matrix
+
+
+def benchmark_k_min(n=10 ** 5, ks=(10, 100, 1000, 10000), repeat=3, seed=0):
+    """
+    Time removing the k smallest items with one extract_k_min call against k
+    extract_min calls, and peek_k_smallest, for every registered heap
+    """
+    rng = np.random.RandomState(seed)
+    priorities = rng.random_sample(n).tolist()
+
+    def populated(backend):
+        heap = PriorityQueue.create(backend)
+        for i, priority in enumerate(priorities):
+            heap.insert(i, priority)
+        return heap
+
+    def best_time(backend, fn, k):
+        best = np.inf
+        for _ in xrange(repeat):
+            heap = populated(backend)
+            heap.extract_min()  # so that the Fibonacci heap is consolidated, as in steady state
+            start = time()
+            fn(heap, k)
+            best = min(best, time() - start)
+        return best
+
+    methods = [
+        ('extract_min x k', lambda heap, k: [heap.extract_min() for _ in xrange(k)]),
+        ('extract_k_min', lambda heap, k: heap.extract_k_min(k)),
+        ('peek_k_smallest', lambda heap, k: heap.peek_k_smallest(k)),
+    ]
+
+    print '\t'.join(['heap', 'k'] + [name for name, _ in methods])
+    for backend in PriorityQueue.backends():
+        for k in ks:
+            times = [best_time(backend, fn, k) for _, fn in methods]
+            print '\t'.join([backend, str(k)] + ['{:0.5f}'.format(t) for t in times])
+
+
+def benchmark_update(n=10 ** 4, ops=10 ** 5, increase_fractions=(0.0, 0.25, 0.5, 1.0), seed=0):
+    """
+    Time a stream of priority changes (a given fraction of them increases, the rest
+    decreases) applied with update_priority against delete followed by insert,
+    for every registered heap.  An extract_min every 10 changes keeps the Fibonacci
+    heap consolidated as in a scheduler.
+    """
+    rng = np.random.RandomState(seed)
+    priorities = rng.random_sample(n).tolist()
+
+    print '\t'.join(['heap', 'increases', 'delete+insert', 'update_priority', 'speedup'])
+    for fraction in increase_fractions:
+        targets = rng.randint(0, n, ops).tolist()
+        increase = (rng.random_sample(ops) < fraction).tolist()
+        deltas = rng.exponential(0.1, ops).tolist()
+
+        for backend in PriorityQueue.backends():
+            times = []
+            for reinsert in [True, False]:
+                heap = PriorityQueue.create(backend)
+                handles = [heap.insert(i, priority) for i, priority in enumerate(priorities)]
+                extracted = set()
+
+                start = time()
+                for j, (i, up, delta) in enumerate(zip(targets, increase, deltas)):
+                    if i in extracted:
+                        continue
+                    x = handles[i]
+                    new_priority = x.priority + delta if up else x.priority - delta
+                    if reinsert:
+                        heap.delete(x)
+                        handles[i] = heap.insert(i, new_priority)
+                    else:
+                        heap.update_priority(x, new_priority)
+                    if j % 10 == 0:
+                        extracted.add(heap.extract_min().obj)
+                times.append(time() - start)
+
+            print '{}\t{:0.2f}\t{:0.5f}\t{:0.5f}\t{:0.2f}x'.format(
+                backend, fraction, times[0], times[1], times[0] / times[1])
+
+
+def _count_allocations(element_class, counter):
+    """
+    Wrap element_class.__init__ to count the Elements allocated (reused ones are reset
+    and not initialized again).
+
+    :return: the original __init__, to be restored afterwards
+    """
+    original = element_class.__init__
+
+    def counting_init(self, *args):
+        counter[0] += 1
+        original(self, *args)
+
+    element_class.__init__ = counting_init
+    return original
+
+
+def benchmark_churn(size=10 ** 4, ops=10 ** 6, seed=0):
+    """
+    Steady-state churn: a heap of size items where every operation extracts the
+    minimum and inserts a new item a random delay later, as in an event queue.
+    Elements allocated and throughput of FibonacciHeap and MinHeap with and without
+    the element pool.
+    """
+    rng = np.random.RandomState(seed)
+    initial = rng.random_sample(size).tolist()
+    delays = rng.exponential(1.0, ops).tolist()
+
+    def churn_fibheap(pool):
+        heap = FibonacciHeap.FibonacciHeap(pool=pool)
+        for i, priority in enumerate(initial):
+            heap.insert(i, priority)
+        start = time()
+        for i, delay in enumerate(delays, size):
+            heap.insert(i, heap.extract_min().priority + delay)
+        return time() - start
+
+    def churn_minheap(pool):
+        heap = MinHeap.MinHeap(pool=pool)
+        for i, priority in enumerate(initial):
+            heap.push(heap.new_element(i, priority))
+        start = time()
+        for i, delay in enumerate(delays, size):
+            heap.push(heap.new_element(i, heap.pop().priority + delay))
+        return time() - start
+
+    print '\t'.join(['heap', 'pool', 'allocated', 'ops/sec'])
+    for name, module, churn in [('fibheap', FibonacciHeap, churn_fibheap),
+                                ('minheap', MinHeap, churn_minheap)]:
+        for pool in [False, True]:
+            counter = [0]
+            original = _count_allocations(module.Element, counter)
+            try:
+                elapsed = churn(pool)
+            finally:
+                module.Element.__init__ = original
+            print '{}\t{}\t{:d}\t{:0.0f}'.format(name, pool, counter[0], ops / elapsed)
+
+
+def benchmark_meld(heaps=1024, size=100, seed=0):
+    """
+    Meld-heavy workload in the pattern of Boruvka's algorithm: every heap is one
+    component, and each round extracts the minimum of every heap, then melds the heaps
+    pairwise until a single heap remains.  Only the backends with a merge method.
+    """
+    rng = np.random.RandomState(seed)
+    priorities = rng.random_sample(heaps * size).tolist()
+
+    print '\t'.join(['heap', 'build', 'meld', 'extract_min', 'total'])
+    for backend in PriorityQueue.backends():
+        if not hasattr(PriorityQueue.create(backend), 'merge'):
+            continue
+        start = time()
+        components = []
+        for i in xrange(heaps):
+            heap = PriorityQueue.create(backend)
+            for j in xrange(i * size, (i + 1) * size):
+                heap.insert(j, priorities[j])
+            components.append(heap)
+        build = time() - start
+
+        meld_time = extract_time = 0.0
+        extracted = 0
+        while len(components) > 1:
+            start = time()
+            for heap in components:
+                if len(heap):
+                    heap.extract_min()
+                    extracted += 1
+            extract_time += time() - start
+            start = time()
+            melded = []
+            for a, b in zip(components[::2], components[1::2]):
+                a.merge(b)
+                melded.append(a)
+            if len(components) % 2:
+                melded.append(components[-1])
+            components = melded
+            meld_time += time() - start
+        assert len(components[0]) == heaps * size - extracted
+
+        print '{}\t{:0.3f}\t{:0.3f}\t{:0.3f}\t{:0.3f}'.format(
+            backend, build, meld_time, extract_time, build + meld_time + extract_time)
+
+
+class _LegacyConsolidateHeap(FibonacciHeap.FibonacciHeap):
+    """
+    FibonacciHeap with _consolidate as it was before the reusable degree table: a new
+    degree array and queue of roots, sized with NumPy, on every call.
+    Baseline of benchmark_consolidate.
+    """
+
+    def _consolidate(self):
+        array = [None] * int(np.ceil(np.log(self._size)/np.log(golden))+1)
+
+        q = deque()
+        while self._min:
+            q.append(self._min)
+            self._remove_from_root_list(self._min)
+
+        while len(q):
+            x = q.popleft()
+            d = x.degree
+
+            while array[d] is not None:
+                y = array[d]
+
+                if x.priority > y.priority:
+                    x, y = y, x
+                self._heap_link(y, x)
+                array[d] = None
+                d += 1
+            array[d] = x
+
+        for elem in array:
+            if elem is not None:
+                if self._min is None:
+                    self._min = elem
+                else:
+                    self._insert_to_root_list(elem)
+                    if elem.priority < self._min.priority:
+                        self._min = elem
+
+
+def benchmark_consolidate(n=10 ** 6, extracts=10 ** 5, seed=0):
+    """
+    Latency of extract_min on a heap of n elements with the legacy _consolidate and the
+    current one.  The first extract_min, which consolidates all n roots, is timed apart.
+    """
+    priorities = np.random.RandomState(seed).random_sample(n).tolist()
+
+    print '\t'.join(['consolidate', 'first (secs)', 'extract_min (us)'])
+    for name, factory in [('legacy', _LegacyConsolidateHeap), ('degree table', FibonacciHeap.FibonacciHeap)]:
+        heap = factory()
+        for i, priority in enumerate(priorities):
+            heap.insert(i, priority)
+
+        start = time()
+        heap.extract_min()
+        first = time() - start
+
+        start = time()
+        for _ in xrange(extracts):
+            heap.extract_min()
+        elapsed = time() - start
+
+        print '{}\t{:0.3f}\t{:0.2f}'.format(name, first, elapsed / extracts * 1e6)
+
+
+if __name__ == '__main__':
+    benchmark_workloads()
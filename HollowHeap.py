@@ -0,0 +1,384 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        HollowHeap
+# Purpose:     Implement Hollow Heap in Python, with the amortized bounds of the
+#              Fibonacci heap (O(1) insert, decrease key and meld, O(log n) delete)
+#              but no cascading cuts: a decrease key moves the element to a new
+#              node and leaves the old one hollow, to be discarded lazily
+#              For a detailed explanation of the algorithm,
+#               see Hansen, Kaplan, Tarjan and Zwick, "Hollow Heaps" (2015)
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import heapq
+import random
+from time import time
+import numpy as np
+import FibonacciHeap
+
+
+class Element(object):
+    """
+    Element is the handle of an object in the heap.
+
+    self.obj: any object (e.g., a vertex or an edge for a graph algorithm)
+    self.priority: priority of this element
+    self.node: the node holding this element, None once it left the heap
+    """
+
+    def __init__(self, obj, priority):
+        self.obj, self.priority = obj, priority
+        self.node = None
+
+    def get_value(self):
+        """
+        :return: object cached in this element
+        """
+        return self.obj
+
+    def get_priority(self):
+        """
+        :return: priority of this element
+        """
+        return self.priority
+
+    def __str__(self):
+        return "({}, {})".format(self.obj, self.priority)
+
+
+class _Node(object):
+    """
+    Node of the hollow heap's DAG.
+
+    self.item: the element held by this node, None if the node is hollow
+    self.key: priority of the node, a lower bound of the keys below it
+    self.child: first child; the children form a list through next
+    self.next: next sibling
+    self.ep: extra parent of a hollow node made by a decrease key, whose last child it is
+    self.rank: rank of the node
+    """
+    __slots__ = ('item', 'key', 'child', 'next', 'ep', 'rank')
+
+    def __init__(self, item, key):
+        self.item, self.key = item, key
+        self.child = self.next = self.ep = None
+        self.rank = 0
+
+
+def _link(v, w):
+    """
+    Make the root with the larger key the first child of the other one.
+
+    :return: the root of the linked tree
+    """
+    if v.key >= w.key:
+        v.next = w.child
+        w.child = v
+        return w
+    w.next = v.child
+    v.child = w
+    return v
+
+
+class HollowHeap(object):
+    """
+    Implements Hollow Heap (one root, multiple parents version)
+    with the priority queue protocol (see PriorityQueue)
+    """
+
+    def __init__(self):
+        """
+        Creates an empty heap
+        """
+        self._root = None
+        self._size = 0
+        self._dict = {}
+        self._ranks = []  # roots by rank, reused by every rebuild
+
+    def __getitem__(self, item):
+        try:
+            return self._dict[item]
+        except KeyError:
+            raise KeyError("Object %s no longer in heap!" % item)
+
+    def __contains__(self, item):
+        return item in self._dict
+
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        return self._dict.get(item, default)
+
+    def __len__(self):
+        """
+        :return: number of elements in the heap
+        """
+        return self._size
+
+    def insert(self, x, priority):
+        """
+        Insert a (x, priority) pair into the heap, as a link of a new node with the root.
+        O(1) operation.
+
+        :return: an reference to the inserted element
+        """
+        elem = Element(x, priority)
+        self._dict[x] = elem
+        self._size += 1
+        self._add(elem)
+        return elem
+
+    def min(self):
+        """
+        :return: a reference to the minimal element in the heap
+        """
+        return self._root.item if self._root is not None else None
+
+    def extract_min(self):
+        """
+        Returns an reference to the minimal element in the heap and removes it from heap
+        :return: an reference to element with the minimal priority value
+        """
+        if self._root is None:
+            return None
+        z = self._root.item
+        self.delete(z)
+        return z
+
+    def extract_k_min(self, k):
+        return [self.extract_min() for _ in xrange(min(k, self._size))]
+
+    def peek_k_smallest(self, k):
+        """
+        :return: list of the (at most) k elements with the smallest priorities, in increasing
+                 order, by a best-first search of the DAG (hollow nodes are passed through)
+        """
+        smallest = []
+        if self._root is None or k <= 0:
+            return smallest
+        frontier = [(self._root.key, 0, self._root)]
+        seen = set()
+        tiebreak = 1
+        while frontier and len(smallest) < k:
+            x = heapq.heappop(frontier)[2]
+            if x.item is not None:
+                smallest.append(x.item)
+            w = x.child
+            while w is not None:
+                if id(w) not in seen:
+                    seen.add(id(w))
+                    heapq.heappush(frontier, (w.key, tiebreak, w))
+                    tiebreak += 1
+                if w.ep is x:
+                    break
+                w = w.next
+        return smallest
+
+    def decrease_key(self, x, new_priority):
+        """
+        Decrease the priority of x: x moves to a new node linked with the root, and its
+        old node becomes hollow, a child of the new node too.  No cut and no cascading.
+        O(1) operation.
+
+        :raise: ValueError if the new priority is not strictly less than the old priority
+        """
+        if new_priority >= x.priority:
+            raise ValueError("Decrease key: new priority value (%s) must "
+                             "be less than old priority (%s)!"
+                             % (new_priority, x.priority))
+        x.priority = new_priority
+        u = x.node
+        if u is self._root:
+            u.key = new_priority
+            return
+        v = _Node(x, new_priority)
+        x.node = v
+        u.item = None
+        if u.rank > 2:
+            v.rank = u.rank - 2
+        v.child = u
+        u.ep = v
+        self._root = _link(v, self._root)
+
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several elements; pairs whose new priority is not
+        less than the current one are ignored.
+
+        :param batch: list of (element, new priority) pairs
+        """
+        for x, new_priority in batch:
+            if new_priority < x.priority:
+                self.decrease_key(x, new_priority)
+
+    def update_priority(self, x, new_priority):
+        """
+        Change the priority of element x, in either direction.  An increase hollows
+        the node of x (rebuilding only if it is the root) and inserts x anew.
+        """
+        if new_priority < x.priority:
+            self.decrease_key(x, new_priority)
+        elif new_priority > x.priority:
+            self._remove(x)
+            x.priority = new_priority
+            self._add(x)
+
+    def delete(self, x):
+        """
+        Delete element x from heap.  Its node becomes hollow; only deleting the root
+        (the minimum) destroys hollow nodes, in O(log n) amortized.
+        """
+        self._remove(x)
+        self._size -= 1
+        if self._dict.get(x.obj) is x:
+            del self._dict[x.obj]
+
+    def merge(self, heap):
+        """
+        Meld another hollow heap into this one with a single link, O(1);
+        the other heap is emptied.
+        :param heap: another HollowHeap
+        """
+        assert isinstance(heap, HollowHeap), \
+            "Invalid heap!"
+        if heap._root is not None:
+            self._root = heap._root if self._root is None else _link(self._root, heap._root)
+        self._size += heap._size
+        self._dict.update(heap._dict)
+        heap._root, heap._size, heap._dict = None, 0, {}
+
+    def _add(self, x):
+        node = _Node(x, x.priority)
+        x.node = node
+        self._root = node if self._root is None else _link(node, self._root)
+
+    def _remove(self, x):
+        """
+        Make the node of x hollow.  If it is the root, destroy the hollow roots
+        and link the remaining full nodes by rank into a single tree again.
+        """
+        x.node.item = None
+        x.node = None
+        h = self._root
+        if h.item is not None:
+            return
+
+        ranks = self._ranks
+        max_rank = -1
+        h.next = None
+        while h is not None:
+            w = h.child
+            v = h
+            h = h.next
+            while w is not None:
+                u = w
+                w = w.next
+                if u.item is None:
+                    if u.ep is None:
+                        # last parent gone: the hollow node is destroyed in turn
+                        u.next = h
+                        h = u
+                    else:
+                        # the node keeps its other parent
+                        if u.ep is v:
+                            w = None
+                        else:
+                            u.next = None
+                        u.ep = None
+                else:
+                    # ranked links
+                    r = u.rank
+                    while r < len(ranks) and ranks[r] is not None:
+                        u = _link(u, ranks[r])
+                        ranks[r] = None
+                        r += 1
+                    u.rank = r
+                    if r >= len(ranks):
+                        ranks.extend([None] * (r + 1 - len(ranks)))
+                    ranks[r] = u
+                    if r > max_rank:
+                        max_rank = r
+            v.child = v.next = None
+
+        # unranked links
+        root = None
+        for r in xrange(max_rank + 1):
+            u = ranks[r]
+            if u is not None:
+                ranks[r] = None
+                u.next = None
+                root = u if root is None else _link(root, u)
+        self._root = root
+
+
+def test_sort(n):
+    heap = HollowHeap()
+    other = HollowHeap()
+
+    correct_result = []
+    elems = []
+    for i in xrange(n):
+        priority = random.randint(0, 100) + random.random()
+        correct_result.append((i, priority))
+        elems.append((heap if i % 2 else other).insert(i, priority))
+
+    for i in random.sample(xrange(n), n // 2):
+        priority = correct_result[i][1] + random.uniform(-50, 50)
+        correct_result[i] = (i, priority)
+        (heap if i % 2 else other).update_priority(elems[i], priority)
+    for i in random.sample(xrange(n), n // 10):
+        (heap if i % 2 else other).delete(elems[i])
+        correct_result[i] = None
+
+    heap.merge(other)
+    correct_result = sorted((x for x in correct_result if x is not None), key=lambda x: x[1])
+
+    test_result = []
+    while len(heap):
+        item = heap.extract_min()
+        test_result.append((item.obj, item.priority))
+
+    if test_result == correct_result:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(n=10 ** 5, decreases=4, seed=0):
+    """
+    Insert n items, decrease every key decreases times (by a random fraction, as the
+    tentative distances of Dijkstra's algorithm), then extract them all, on the
+    hollow heap and on FibonacciHeap.
+    """
+    rng = np.random.RandomState(seed)
+    priorities = (rng.random_sample(n) + decreases).tolist()
+    factors = rng.random_sample((decreases, n)).tolist()
+
+    print '\t'.join(['heap', 'insert', 'decrease_key', 'extract_min', 'total'])
+    for name, heap in [('hollow', HollowHeap()), ('fibheap', FibonacciHeap.FibonacciHeap())]:
+        start = time()
+        elems = [heap.insert(i, p) for i, p in enumerate(priorities)]
+        decrease_start = time()
+        for r in xrange(decreases):
+            for elem, f in zip(elems, factors[r]):
+                heap.decrease_key(elem, elem.priority - f)
+        extract_start = time()
+        last = -np.inf
+        while len(heap):
+            priority = heap.extract_min().priority
+            assert priority >= last
+            last = priority
+        end = time()
+        print '{}\t{:0.3f}\t{:0.3f}\t{:0.3f}\t{:0.3f}'.format(
+            name, decrease_start - start, extract_start - decrease_start, end - extract_start, end - start)
+
+
+if __name__ == '__main__':
+    test_sort(1000)
+    benchmark()
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        KWayMerge
+# Purpose:     Lazy k-way merge of sorted iterators on MinHeap, emitting whole runs
+#              of a chunk per heap operation, and a loser (tournament) tree variant,
+#              both in memory proportional to the number of streams
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+from bisect import bisect_left, bisect_right
+import heapq
+from itertools import islice
+from time import time
+import numpy as np
+import MinHeap
+
+
+def _chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def merge_chunks(chunked, key=None):
+    """
+    Merge sorted streams given as iterators of sorted chunks (lists, or anything tolist()
+    turns into one, e.g., NumPy arrays), yielding the merged output one list at a time.
+
+    The streams are in a MinHeap by the (key, stream index) of their current head.
+    Every item of the smallest stream's chunk up to the head of the next stream is
+    emitted at once (found by bisection), and the stream is moved to its new head with
+    a single replace, so the heap costs one bubble down per run of consecutive items
+    from the same stream instead of a pop and a push per item.  Items with equal keys
+    come out in the order of the streams, as in heapq.merge.
+
+    :param chunked: list of iterators of chunks, one per stream
+    :param key: function computing the sort key of an item, the item itself by default
+    :return: iterator of lists of items
+    """
+    heap = MinHeap.MinHeap()
+    streams = []  # [chunk iterator, chunk, keys of the chunk, position]
+
+    def load(i):
+        """Advance stream i to its next non-empty chunk, False when it is exhausted."""
+        stream = streams[i]
+        for chunk in stream[0]:
+            chunk = chunk.tolist() if hasattr(chunk, 'tolist') else list(chunk)
+            if chunk:
+                stream[1], stream[3] = chunk, 0
+                stream[2] = chunk if key is None else [key(item) for item in chunk]
+                return True
+        return False
+
+    for i, chunks in enumerate(chunked):
+        streams.append([iter(chunks), None, None, 0])
+        if load(i):
+            heap.push(MinHeap.Element(i, (streams[i][2][0], i)))
+
+    entries = heap._heap
+    while entries:
+        top = entries[0]
+        i = top.obj
+        stream = streams[i]
+        chunk, keys, position = stream[1], stream[2], stream[3]
+
+        if len(entries) > 1:
+            # the next smallest head is a child of the top
+            second = entries[1] if len(entries) == 2 or entries[1] < entries[2] else entries[2]
+            limit, j = second.priority
+            # equal keys of an earlier stream go first
+            end = (bisect_right if i < j else bisect_left)(keys, limit, position)
+        else:
+            end = len(chunk)
+
+        yield chunk[position:end]
+        stream[3] = end
+        if end < len(chunk) or load(i):
+            top.priority = (stream[2][stream[3]], i)
+            heap.replace(top)
+        else:
+            heap.pop()
+        entries = heap._heap
+
+
+def merge(iterables, key=None, chunk_size=1 << 10):
+    """
+    Lazily merge sorted iterables into one sorted iterator, like heapq.merge.
+    Each iterable is read chunk_size items at a time, see merge_chunks.
+
+    :param iterables: sorted iterables
+    :param key: function computing the sort key of an item, the item itself by default
+    :return: iterator of the merged items
+    """
+    for run in merge_chunks([_chunks(iterable, chunk_size) for iterable in iterables], key):
+        for item in run:
+            yield item
+
+
+class LoserTree(object):
+    """
+    Tournament tree over k streams: every internal node keeps the loser of the match
+    played there and self._winner the overall winner, so advancing the winner replays
+    only the matches on the path from its leaf to the root (log k comparisons, and no
+    swaps of heap entries).
+
+    The heads are (0, key, index) for a live stream and (1, 0, index) for an
+    exhausted one, so exhausted streams lose every match.
+    """
+
+    def __init__(self, iterables, key=None):
+        self.key = key
+        self._iterators = [iter(iterable) for iterable in iterables]
+        self._items = [None] * len(self._iterators)
+        self._heads = [self._next(i) for i in xrange(len(self._iterators))]
+
+        k = max(1, len(self._iterators))
+        self._k = k
+        self._losers = [0] * k
+        winners = [0] * (2 * k)
+        for node in xrange(k, 2 * k):
+            winners[node] = node - k
+        heads = self._heads if self._heads else [(1, 0, 0)]
+        for node in xrange(k - 1, 0, -1):
+            a, b = winners[2 * node], winners[2 * node + 1]
+            if heads[b] < heads[a]:
+                a, b = b, a
+            winners[node], self._losers[node] = a, b
+        self._winner = winners[1] if k > 1 else 0
+
+    def _next(self, i):
+        """
+        :return: the head of stream i after reading its next item
+        """
+        for item in self._iterators[i]:
+            self._items[i] = item
+            return 0, (item if self.key is None else self.key(item)), i
+        self._items[i] = None
+        return 1, 0, i
+
+    def __iter__(self):
+        heads, losers, items, k = self._heads, self._losers, self._items, self._k
+        if not heads:
+            return
+        winner = self._winner
+        while heads[winner][0] == 0:
+            yield items[winner]
+            heads[winner] = head = self._next(winner)
+            node = (winner + k) >> 1
+            while node:
+                loser = losers[node]
+                if heads[loser] < head:
+                    losers[node], winner = winner, loser
+                    head = heads[winner]
+                node >>= 1
+        self._winner = winner
+
+
+def merge_loser_tree(iterables, key=None):
+    """
+    Lazily merge sorted iterables with a LoserTree.
+
+    :return: iterator of the merged items
+    """
+    return iter(LoserTree(iterables, key))
+
+
+def test_merge(k, n):
+    rng = np.random.RandomState(0)
+    streams = [sorted(rng.randint(0, n // 3 + 1, rng.randint(0, n)).tolist()) for _ in xrange(k)]
+    tagged = [[(value, i) for value in stream] for i, stream in enumerate(streams)]
+    expected = list(heapq.merge(*tagged))
+    first = lambda pair: pair[0]
+
+    results = [
+        list(merge(tagged, key=first, chunk_size=7)),
+        list(merge_loser_tree(tagged, key=first)),
+        [item for run in merge_chunks([np.array_split(np.array(s, dtype=int), 3) for s in streams])
+         for item in run],
+    ]
+    if results[0] == expected and results[1] == expected \
+            and results[2] == [value for value, _ in expected]:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(n=10 ** 6, ks=(2, 10, 100, 1000, 10 ** 4), seed=0):
+    """
+    Time to consume the merge of k sorted streams of n items in total: heapq.merge,
+    merge on MinHeap (chunks of 1024), merge_loser_tree and merge_chunks over NumPy chunks.
+    Interleaved streams have random values; clustered ones are sorted segments of the
+    value range, as time-partitioned logs, with runs of 100 items per stream.
+    """
+    rng = np.random.RandomState(seed)
+    print '\t'.join(['data', 'k', 'heapq.merge', 'merge', 'merge_loser_tree', 'merge_chunks'])
+    for data in ['interleaved', 'clustered']:
+        for k in ks:
+            values = np.sort(rng.random_sample(n))
+            if data == 'interleaved':
+                assignment = rng.randint(0, k, n)
+            else:
+                assignment = (np.arange(n) // 100) % k
+            streams = [values[assignment == i] for i in xrange(k)]
+            lists = [stream.tolist() for stream in streams]
+
+            methods = [
+                lambda: heapq.merge(*lists),
+                lambda: merge(lists),
+                lambda: merge_loser_tree(lists),
+                lambda: (x for run in merge_chunks([np.array_split(s, max(1, len(s) // 1024))
+                                                    for s in streams]) for x in run),
+            ]
+            times = []
+            for method in methods:
+                start = time()
+                for _ in method():
+                    pass
+                times.append(time() - start)
+            print '\t'.join([data, str(k)] + ['{:0.3f}'.format(t) for t in times])
+
+
+if __name__ == '__main__':
+    test_merge(10, 1000)
+    benchmark()
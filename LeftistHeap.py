@@ -0,0 +1,336 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        LeftistHeap
+# Purpose:     Implement Leftist Heap in Python, a mergeable heap whose meld
+#              walks only the short right spines of the two trees, in O(log n)
+#              For a detailed explanation of the algorithm,
+#               see Knuth, TAOCP Vol. 3 (5.2.3) or Tarjan, "Data Structures
+#               and Network Algorithms" (Ch. 3)
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import heapq
+import random
+
+
+class Element(object):
+    """
+    Element is the internal data structure that holds the priority and object.
+
+    self.obj: any object (e.g., a vertex or an edge for a graph algorithm)
+    self.priority: priority of this node
+    self.left, self.right: the children of this node
+    self.parent: the parent of this node
+    self.rank: length of the right spine of this node (0 for an empty tree), so
+               that rank(left) >= rank(right) for every node
+    """
+
+    def __init__(self, obj, priority):
+        self.obj, self.priority = obj, priority
+        self.left = self.right = self.parent = None
+        self.rank = 1
+
+    def get_value(self):
+        """
+        :return: object cached in this node
+        """
+        return self.obj
+
+    def get_priority(self):
+        """
+        :return: priority of this node
+        """
+        return self.priority
+
+    def __str__(self):
+        return "({}, {})".format(self.obj, self.priority)
+
+
+def _meld(a, b):
+    """
+    Meld two leftist trees by merging their right spines, then restoring the ranks
+    (and swapping children where needed) bottom-up along the merged spine.
+
+    :return: the root of the melded tree
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b.priority < a.priority:
+        a, b = b, a
+    root = a
+    root.parent = None
+
+    spine = []
+    while True:
+        spine.append(a)
+        right = a.right
+        if right is None:
+            a.right = b
+            b.parent = a
+            break
+        if b.priority < right.priority:
+            # b takes the place of the right child, which is merged below b instead
+            a.right = b
+            b.parent = a
+            a, b = b, right
+        else:
+            a = right
+
+    for node in reversed(spine):
+        left, right = node.left, node.right
+        if left is None or left.rank < right.rank:
+            node.left, node.right = right, left
+        node.rank = node.right.rank + 1 if node.right is not None else 1
+
+    return root
+
+
+class LeftistHeap(object):
+    """
+    Implements Leftist Heap with the priority queue protocol (see PriorityQueue)
+    """
+
+    def __init__(self):
+        """
+        Creates an empty heap
+        """
+        self._root = None
+        self._size = 0
+        self._dict = {}
+
+    def __getitem__(self, item):
+        try:
+            return self._dict[item]
+        except KeyError:
+            raise KeyError("Object %s no longer in heap!" % item)
+
+    def __contains__(self, item):
+        return item in self._dict
+
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        return self._dict.get(item, default)
+
+    def __len__(self):
+        """
+        :return: number of nodes in the heap
+        """
+        return self._size
+
+    def insert(self, x, priority):
+        """
+        Insert a (x, priority) pair into the heap, as a meld with a one node tree.
+        O(log n) operation.
+
+        :return: an reference to the inserted node
+        """
+        elem = Element(x, priority)
+        self._dict[x] = elem
+        self._root = _meld(self._root, elem)
+        self._size += 1
+        return elem
+
+    def min(self):
+        """
+        :return: a reference to the minimal element in the heap
+        """
+        return self._root
+
+    def extract_min(self):
+        """
+        Returns an reference to the minimal element in the heap and removes it from heap
+        :return: an reference to element with the minimal priority value
+        """
+        z = self._root
+        if z is not None:
+            self._root = _meld(self._detach(z.left), self._detach(z.right))
+            z.left = z.right = None
+            z.rank = 1
+            self._size -= 1
+            if self._dict.get(z.obj) is z:
+                del self._dict[z.obj]
+        return z
+
+    def extract_k_min(self, k):
+        return [self.extract_min() for _ in xrange(min(k, self._size))]
+
+    def peek_k_smallest(self, k):
+        """
+        :return: list of the (at most) k elements with the smallest priorities, in increasing
+                 order, by a best-first search of the tree
+        """
+        smallest = []
+        frontier = [(self._root.priority, 0, self._root)] if self._root is not None and k > 0 else []
+        tiebreak = 1
+        while frontier and len(smallest) < k:
+            x = heapq.heappop(frontier)[2]
+            smallest.append(x)
+            for child in (x.left, x.right):
+                if child is not None:
+                    heapq.heappush(frontier, (child.priority, tiebreak, child))
+                    tiebreak += 1
+        return smallest
+
+    def decrease_key(self, x, new_priority):
+        """
+        Decrease the priority of x: the subtree of x stays heap ordered, so it is cut
+        from its parent (restoring the ranks above it) and melded with the root.
+        O(log n) operation.
+
+        :raise: ValueError if the new priority is not strictly less than the old priority
+        """
+        if new_priority >= x.priority:
+            raise ValueError("Decrease key: new priority value (%s) must "
+                             "be less than old priority (%s)!"
+                             % (new_priority, x.priority))
+        x.priority = new_priority
+        if x.parent is not None:
+            self._cut(x)
+            self._root = _meld(self._root, x)
+
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several elements; pairs whose new priority is not
+        less than the current one are ignored.
+
+        :param batch: list of (element, new priority) pairs
+        """
+        for x, new_priority in batch:
+            if new_priority < x.priority:
+                self.decrease_key(x, new_priority)
+
+    def update_priority(self, x, new_priority):
+        """
+        Change the priority of element x, in either direction.  An increase removes x
+        (melding its children in its place) and melds it back alone.
+        """
+        if new_priority < x.priority:
+            self.decrease_key(x, new_priority)
+        elif new_priority > x.priority:
+            self._remove(x)
+            x.priority = new_priority
+            self._root = _meld(self._root, x)
+
+    def delete(self, x):
+        """
+        Delete element x from heap, in O(log n).
+        """
+        self._remove(x)
+        self._size -= 1
+        if self._dict.get(x.obj) is x:
+            del self._dict[x.obj]
+
+    def merge(self, heap):
+        """
+        Meld another leftist heap into this one in O(log n); the other heap is emptied.
+        :param heap: another LeftistHeap
+        """
+        assert isinstance(heap, LeftistHeap), \
+            "Invalid heap!"
+        self._root = _meld(self._root, heap._root)
+        self._size += heap._size
+        self._dict.update(heap._dict)
+        heap._root, heap._size, heap._dict = None, 0, {}
+
+    @staticmethod
+    def _detach(x):
+        if x is not None:
+            x.parent = None
+        return x
+
+    def _remove(self, x):
+        """
+        Take node x out of the tree, its children melded in its place.  x stays in _dict.
+        """
+        children = _meld(self._detach(x.left), self._detach(x.right))
+        x.left = x.right = None
+        x.rank = 1
+        if x.parent is None:
+            self._root = children
+        else:
+            parent = x.parent
+            if parent.left is x:
+                parent.left = children
+            else:
+                parent.right = children
+            if children is not None:
+                children.parent = parent
+            x.parent = None
+            self._fix_ranks(parent)
+
+    def _cut(self, x):
+        """
+        Cut the subtree of x from its parent.
+        """
+        parent = x.parent
+        if parent.left is x:
+            parent.left = None
+        else:
+            parent.right = None
+        x.parent = None
+        self._fix_ranks(parent)
+
+    @staticmethod
+    def _fix_ranks(node):
+        """
+        Restore the leftist property and the ranks from node up, after one of its
+        subtrees changed, until a rank stays the same.
+        """
+        while node is not None:
+            left, right = node.left, node.right
+            left_rank = left.rank if left is not None else 0
+            right_rank = right.rank if right is not None else 0
+            if left_rank < right_rank:
+                node.left, node.right = right, left
+                right_rank = left_rank
+            rank = right_rank + 1
+            if rank == node.rank:
+                return
+            node.rank = rank
+            node = node.parent
+
+
+def test_sort(n):
+    heap = LeftistHeap()
+    other = LeftistHeap()
+
+    correct_result = []
+    elems = []
+    for i in xrange(n):
+        priority = random.randint(0, 100) + random.random()
+        correct_result.append((i, priority))
+        elems.append((heap if i % 2 else other).insert(i, priority))
+
+    for i in random.sample(xrange(n), n // 2):
+        priority = correct_result[i][1] + random.uniform(-50, 50)
+        correct_result[i] = (i, priority)
+        (heap if i % 2 else other).update_priority(elems[i], priority)
+    for i in random.sample(xrange(n), n // 10):
+        (heap if i % 2 else other).delete(elems[i])
+        correct_result[i] = None
+
+    heap.merge(other)
+    correct_result = sorted((x for x in correct_result if x is not None), key=lambda x: x[1])
+
+    test_result = []
+    while len(heap):
+        item = heap.extract_min()
+        test_result.append((item.obj, item.priority))
+
+    if test_result == correct_result:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+if __name__ == '__main__':
+    test_sort(1000)
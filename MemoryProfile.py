@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        MemoryProfile
+# Purpose:     Measure peak and steady-state memory of the data structures
+#              Used alongside the timing results of the heap benchmarks
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import gc
+import sys
+import resource
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2 has no tracemalloc, fall back to the RSS high water mark
+    tracemalloc = None
+
+
+def instance_size(obj):
+    """
+    Size in bytes of a single object, including its attribute dictionary and
+    the containers (e.g., forward pointer lists) it owns, but NOT the objects
+    it points to.
+
+    :param obj: any object
+    :return: number of bytes
+    """
+    size = sys.getsizeof(obj)
+    attrs = getattr(obj, '__dict__', None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+        for value in attrs.itervalues():
+            if isinstance(value, (list, tuple, dict)):
+                size += sys.getsizeof(value)
+    return size
+
+
+def _referents(x):
+    """
+    :return: the objects directly referenced by x that deep_sizeof follows
+    """
+    refs = []
+    if isinstance(x, dict):
+        refs.extend(x.iterkeys())
+        refs.extend(x.itervalues())
+    elif isinstance(x, (list, tuple, set, frozenset)):
+        refs.extend(x)
+
+    attrs = getattr(x, '__dict__', None)
+    if attrs is not None:
+        refs.append(attrs)
+    return refs
+
+
+def deep_sizeof(obj, exclude=()):
+    """
+    Retained size in bytes of obj and every object reachable from it.
+    Shared objects are only counted once, and objects reachable from
+    exclude (e.g., the graph whose vertices a heap holds) are not counted.
+
+    :param obj: any object
+    :param exclude: objects whose reachable objects are not counted
+    :return: number of bytes
+    """
+    seen = set()
+    stack = list(exclude)
+    while stack:
+        x = stack.pop()
+        if id(x) not in seen:
+            seen.add(id(x))
+            stack.extend(_referents(x))
+
+    size = 0
+    stack = [obj]
+    while stack:
+        x = stack.pop()
+        if id(x) in seen:
+            continue
+        seen.add(id(x))
+        size += sys.getsizeof(x)
+        stack.extend(_referents(x))
+
+    return size
+
+
+def max_rss():
+    """
+    :return: the peak resident set size of this process in bytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss():
+    """
+    :return: the current resident set size of this process in bytes, None where
+             /proc/self/status is not available
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """
+    Reset the RSS high water mark of this process to its current RSS (Linux 4.0+),
+    so that max_rss measures the peak of what runs next.
+
+    :return: True if the high water mark was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except IOError:
+        return False
+    return rss() is not None
+
+
+def measure(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) and measure the memory it allocated.
+
+    With tracemalloc, peak is the highest traced allocation during the call and
+    steady is what is still allocated after it returns.  Without tracemalloc,
+    steady is the deep size of the returned object, not counting the objects
+    reachable from the other arguments, so a phase reports what it retains by
+    returning it (even if it is one of the arguments).  peak is then only an RSS
+    approximation: the RSS high water mark is reset before the call, and peak is
+    how far it rose above the RSS at the start of the call (where it cannot be reset,
+    the growth of the process high water mark).  Memory the allocator had already
+    mapped hides from the RSS, so peak is raised to at least steady.
+
+    :return: (result, peak_bytes, steady_bytes)
+    """
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            result = fn(*args, **kwargs)
+            steady, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    else:
+        before = rss() if reset_peak_rss() else max_rss()
+        result = fn(*args, **kwargs)
+        rss_peak = max_rss() - before
+        shared = [arg for arg in args if arg is not result]
+        steady = deep_sizeof(result, exclude=shared) if result is not None else 0
+        peak = max(rss_peak, steady)
+
+    return result, peak, steady
@@ -10,6 +10,7 @@
 # -------------------------------------------------------------------------------
 
 import random
+import heapq
 
 
 class Element(object):
@@ -18,10 +19,19 @@ class Element(object):
 
     self.obj: any object (e.g., a vertex or an edge for a graph algorithm)
     self.priority: priority of this node
+    self.generation: number of times this element was reused from a pool
     """
 
     def __init__(self, obj, priority):
         self.obj, self.priority = obj, priority
+        self.generation = 0
+
+    def reset(self, obj, priority):
+        """
+        Reuse this element for another (obj, priority) pair, as a new generation
+        """
+        self.obj, self.priority = obj, priority
+        self.generation += 1
 
     def get_value(self):
         """
@@ -47,9 +57,55 @@ class Element(object):
 
 
 class MinHeap(object):
-    def __init__(self):
+    def __init__(self, pool=False):
+        """
+        :param pool: keep the popped elements for reuse by new_element.  A popped
+                     element then stays valid only until the next new_element call;
+                     a caller keeping elements longer should keep their generation
+                     too and check them with is_live.
+        """
         self._heap = []
         self._dict = {}  # keeps track of the the position of each item
+        self._pool = [] if pool else None
+
+    def new_element(self, obj, priority):
+        """
+        :return: an Element for (obj, priority), reused from the pool if possible
+        """
+        if self._pool:
+            item = self._pool.pop()
+            item.reset(obj, priority)
+            return item
+        return Element(obj, priority)
+
+    def is_live(self, item, generation=None):
+        """
+        :param item: an element pushed onto the heap
+        :param generation: item.generation when it was pushed, to detect an element
+                           reused from the pool for another push
+        :return: whether item is in the heap (in the same generation)
+        """
+        index = self._dict.get(item.obj)
+        return index is not None and self._heap[index] is item \
+            and (generation is None or item.generation == generation)
+
+    def _check_live(self, item):
+        if not self.is_live(item):
+            raise KeyError("Stale handle %s, no longer in heap!" % item)
+
+    def __contains__(self, item):
+        return item in self._dict
+
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        index = self._dict.get(item)
+        if index is None:
+            return default
+        return self._heap[index]
 
     def push(self, item):
         """Push item onto heap, maintaining the heap invariant."""
@@ -69,12 +125,98 @@ class MinHeap(object):
             if len(self._heap):
                 self._bubble_down(0)
 
+            if self._pool is not None:
+                self._pool.append(min_item)
             return min_item
         else:
             raise IndexError("Pop: Heap is empty!")
 
+    def replace(self, item):
+        """
+        Pop the smallest item and push the new item in a single bubble down.
+        Unlike pushpop, the smallest item is returned even if it is larger than item.
+        """
+        assert isinstance(item, Element), \
+            "Replace: Invalid element!"
+        if not len(self._heap):
+            raise IndexError("Replace: Heap is empty!")
+        min_item = self._heap[0]
+        del self._dict[min_item.obj]
+        self._heap[0] = item
+        self._dict[item.obj] = 0
+        self._bubble_down(0)
+        if self._pool is not None:
+            self._pool.append(min_item)
+        return min_item
+
+    def pushpop(self, item):
+        """
+        Push item and then pop the smallest item, in a single bubble down.
+        If item is not larger than the smallest item, it is returned right away.
+        """
+        if len(self._heap) and self._heap[0] < item:
+            return self.replace(item)
+        return item
+
+    def pop_many(self, k):
+        """
+        Pop the k smallest items (all of them if the heap has fewer).  If k is large
+        relative to the heap (more than n / log(n) items), the k smallest are found by a
+        best-first search (see peek_k_smallest) and the rest of the heap is rebuilt
+        with one O(n) heapify pass, instead of bubbling down after every pop.
+
+        :param k: number of items to pop
+        :return: list of the popped items in increasing order of priority
+        """
+        n = len(self._heap)
+        k = min(k, n)
+        if k <= n // max(1, n.bit_length()):
+            return [self.pop() for _ in xrange(k)]
+
+        indices = self._k_smallest(k)
+        items = [self._heap[i] for i in indices]
+        taken = set(indices)
+
+        self._heap = [item for i, item in enumerate(self._heap) if i not in taken]
+        for item in items:
+            del self._dict[item.obj]
+        if self._pool is not None:
+            self._pool.extend(items)
+        for i, item in enumerate(self._heap):
+            self._dict[item.obj] = i
+        self._heapify()
+
+        return items
+
+    def peek_k_smallest(self, k):
+        """
+        Non-destructive version of pop_many, in O(k log k) time by exploring
+        the heap best-first with an auxiliary heap.
+
+        :param k: number of items
+        :return: list of the (at most) k items with the smallest priorities, in increasing order
+        """
+        return [self._heap[i] for i in self._k_smallest(k)]
+
+    def _k_smallest(self, k):
+        """
+        :return: the indices of the (at most) k smallest items, in increasing order of priority
+        """
+        heap = self._heap
+        smallest = []
+        frontier = [(heap[0].priority, 0)] if heap and k > 0 else []
+        while frontier and len(smallest) < k:
+            index = heapq.heappop(frontier)[1]
+            smallest.append(index)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child].priority, child))
+        return smallest
+
     def decrease_key(self, item, new_priority):
         """Pop the smallest item off the heap, maintaining the heap invariant."""
+        if self._pool is not None:
+            self._check_live(item)
         if new_priority > item.priority:
             raise ValueError("Decrease key: new priority value (%s) must "
                              "be less than old priority (%s)!"
@@ -83,11 +225,88 @@ class MinHeap(object):
         item.priority = new_priority
         self._bubble_up(self._dict[item.obj])
 
+    def update_priority(self, item, new_priority):
+        """
+        Change the priority of item, in either direction: the item is
+        bubbled up after a decrease and bubbled down after an increase.
+        """
+        if self._pool is not None:
+            self._check_live(item)
+        old_priority = item.priority
+        item.priority = new_priority
+        if new_priority < old_priority:
+            self._bubble_up(self._dict[item.obj])
+        elif new_priority > old_priority:
+            self._bubble_down(self._dict[item.obj])
+
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several items at once, e.g. all the neighbors of
+        a vertex in Prim's or Dijkstra's algorithm.  If the batch is large relative to
+        the heap (more than n / log(n) items), the heap is repaired with a single O(n)
+        heapify pass instead of bubbling up every item.
+        Pairs whose new priority is not less than the current one are ignored,
+        so an item may appear more than once in the batch.
+
+        :param batch: list of (item, new priority) pairs
+        """
+        if self._pool is not None:
+            for item, _ in batch:
+                self._check_live(item)
+        n = len(self._heap)
+        if len(batch) > n // max(1, n.bit_length()):
+            for item, new_priority in batch:
+                if new_priority < item.priority:
+                    item.priority = new_priority
+            self._heapify()
+        else:
+            for item, new_priority in batch:
+                if new_priority < item.priority:
+                    item.priority = new_priority
+                    self._bubble_up(self._dict[item.obj])
+
+    def merge(self, heap):
+        """
+        Merge another MinHeap into this one; the other heap is emptied.
+        A heap small relative to the result (at most n / log(n) items) is pushed item
+        by item; otherwise its items are appended, their positions fixed up, and the
+        whole heap is rebuilt with one O(n) heapify pass.
+
+        :param heap: another MinHeap, with none of the objects of this one
+        """
+        assert isinstance(heap, MinHeap), \
+            "Invalid heap!"
+        items = heap._heap
+        for item in items:
+            if item.obj in self._dict:
+                raise ValueError("Merge: object %s is in both heaps!" % item.obj)
+
+        n = len(self._heap) + len(items)
+        if len(items) <= n // max(1, n.bit_length()):
+            for item in items:
+                self.push(item)
+        else:
+            offset = len(self._heap)
+            self._heap.extend(items)
+            for i, item in enumerate(items, offset):
+                self._dict[item.obj] = i
+            self._heapify()
+
+        if self._pool is not None and heap._pool:
+            self._pool.extend(heap._pool)
+            heap._pool = []
+        heap._heap, heap._dict = [], {}
+
     def _swap(self, i, j):
         self._dict[self._heap[i].obj] = j
         self._dict[self._heap[j].obj] = i
         self._heap[i], self._heap[j] = self._heap[j], self._heap[i]
 
+    def _heapify(self):
+        """Restore the heap invariant over the whole heap in O(n)."""
+        for index in xrange(len(self._heap) // 2 - 1, -1, -1):
+            self._bubble_down(index)
+
     def _bubble_down(self, index):
         while index < len(self._heap):
             left_child_index = index * 2 + 1
@@ -186,6 +405,198 @@ def test_sort(n):
         print "Something is wrong!"
 
 
+def test_merge(n):
+    """Merge small (pushed) and large (heapified) heaps, and empty ones, and drain the result"""
+    ok = True
+    for sizes in [(n, n), (n, 1), (1, n), (n, 0), (0, n), (0, 0)]:
+        heaps = [MinHeap(), MinHeap()]
+        expected = []
+        for i, (heap, size) in enumerate(zip(heaps, sizes)):
+            for j in xrange(size):
+                priority = random.random()
+                heap.push(Element((i, j), priority))
+                expected.append(((i, j), priority))
+        heaps[0].merge(heaps[1])
+        expected.sort(key=lambda x: x[1])
+
+        actual = []
+        while len(heaps[0]):
+            item = heaps[0].pop()
+            actual.append((item.obj, item.priority))
+        ok = ok and actual == expected and len(heaps[1]) == 0
+
+    heap, other = MinHeap(), MinHeap()
+    heap.push(Element(0, 1.0))
+    other.push(Element(0, 2.0))
+    try:
+        heap.merge(other)
+        ok = False
+    except ValueError:
+        pass
+
+    if ok:
+        print 'test_merge: working!'
+    else:
+        print 'test_merge: wrong extraction order after merge'
+        return False
+
+
+def test_decrease_keys(n):
+    """Batch decrease, small (bubble up) and large (heapify) batches, and drain the heap"""
+    ok = True
+    for fraction in [0.01, 0.5]:
+        heap = MinHeap()
+        elems = [Element(i, random.random()) for i in xrange(n)]
+        for elem in elems:
+            heap.push(elem)
+        expected = dict((elem.obj, elem.priority) for elem in elems)
+
+        batch = []
+        for elem in random.sample(elems, int(n * fraction)):
+            batch.append((elem, expected[elem.obj] - random.random()))
+            batch.append((elem, expected[elem.obj] + random.random()))
+        random.shuffle(batch)
+        for elem, new_priority in batch:
+            expected[elem.obj] = min(expected[elem.obj], new_priority)
+        heap.decrease_keys(batch)
+
+        actual = []
+        while len(heap):
+            item = heap.pop()
+            actual.append((item.obj, item.priority))
+        ok = ok and actual == sorted(expected.items(), key=lambda x: x[1])
+
+    if ok:
+        print 'test_decrease_keys: working!'
+    else:
+        print 'test_decrease_keys: wrong extraction order after decrease_keys'
+        return False
+
+
+def test_k_smallest(n):
+    """peek_k_smallest leaves the heap intact, pop_many removes the same k items"""
+    heap = MinHeap()
+    priorities = [random.random() for _ in xrange(n)]
+    for i, priority in enumerate(priorities):
+        heap.push(Element(i, priority))
+    expected = sorted(priorities)
+
+    ok = True
+    # 1 and 10 pop one by one, n // 3 takes the best-first search and heapify path
+    for k in [0, 1, 10, n // 3]:
+        peeked = [item.priority for item in heap.peek_k_smallest(k)]
+        popped = [item.priority for item in heap.pop_many(k)]
+        ok = ok and peeked == popped == expected[:k]
+        expected = expected[k:]
+    ok = ok and [heap.pop().priority for _ in xrange(len(heap))] == expected
+
+    if ok:
+        print 'test_k_smallest: working!'
+    else:
+        print 'test_k_smallest: k smallest differ from sorted()'
+        return False
+
+
+def test_update_priority(n):
+    """Increase and decrease priorities and drain the heap"""
+    heap = MinHeap()
+    elems = [Element(i, random.random()) for i in xrange(n)]
+    for elem in elems:
+        heap.push(elem)
+    expected = dict((elem.obj, elem.priority) for elem in elems)
+
+    for elem in random.sample(elems, n // 2):
+        new_priority = elem.priority + random.uniform(-1, 1)
+        heap.update_priority(elem, new_priority)
+        expected[elem.obj] = new_priority
+
+    actual = []
+    while len(heap):
+        item = heap.pop()
+        actual.append((item.obj, item.priority))
+
+    if actual == sorted(expected.items(), key=lambda x: x[1]):
+        print 'test_update_priority: working!'
+    else:
+        print 'test_update_priority: wrong extraction order after update_priority'
+        return False
+
+
+def test_replace(n):
+    """replace and pushpop against heapq.heapreplace and heapq.heappushpop"""
+    heap = MinHeap()
+    reference = []
+    for i in xrange(n):
+        priority = random.random()
+        heap.push(Element(i, priority))
+        heapq.heappush(reference, priority)
+
+    ok = True
+    for i in xrange(n, 3 * n):
+        priority = random.random()
+        if i % 2:
+            ok = ok and heap.replace(Element(i, priority)).priority == heapq.heapreplace(reference, priority)
+        else:
+            ok = ok and heap.pushpop(Element(i, priority)).priority == heapq.heappushpop(reference, priority)
+    ok = ok and [heap.pop().priority for _ in xrange(len(heap))] == sorted(reference)
+
+    if ok:
+        print 'test_replace: working!'
+    else:
+        print 'test_replace: replace / pushpop differ from heapq'
+        return False
+
+
+def test_pool(n):
+    """Churn a pooled heap against heapq, then check element reuse and stale handle detection"""
+    heap = MinHeap(pool=True)
+    reference = []
+    for i in xrange(n):
+        priority = random.random()
+        heap.push(heap.new_element(i, priority))
+        heapq.heappush(reference, priority)
+
+    ok = True
+    for i in xrange(n, 3 * n):
+        priority = random.random()
+        if i % 2:
+            ok = ok and heap.pop().priority == heapq.heappop(reference)
+            heap.push(heap.new_element(i, priority))
+            heapq.heappush(reference, priority)
+        else:
+            ok = ok and heap.replace(heap.new_element(i, priority)).priority == \
+                heapq.heapreplace(reference, priority)
+
+    item = heap.pop()
+    obj, generation = item.obj, item.generation
+    ok = ok and not heap.is_live(item)
+    try:
+        heap.decrease_key(item, -1)
+        ok = False
+    except KeyError:
+        pass
+    reused = heap.new_element(-1, 0.5)
+    heap.push(reused)
+    ok = ok and reused is item and heap.is_live(reused) and not heap.is_live(reused, generation) \
+        and reused.obj != obj
+
+    heapq.heappop(reference)
+    heapq.heappush(reference, 0.5)
+    ok = ok and [item.priority for item in heap.pop_many(len(heap))] == sorted(reference)
+
+    if ok:
+        print 'test_pool: working!'
+    else:
+        print 'test_pool: pooled heap differs from heapq'
+        return False
+
+
 if __name__ == '__main__':
     test_sort(1000)
     test_decrease_key(1000)
+    test_merge(1000)
+    test_decrease_keys(1000)
+    test_k_smallest(1000)
+    test_update_priority(1000)
+    test_replace(1000)
+    test_pool(1000)
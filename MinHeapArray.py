@@ -0,0 +1,359 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        MinHeapArray
+# Purpose:     MinHeap over typed arrays (struct of arrays): the priorities in
+#              heap order are kept in an array('d') next to the object ids, and
+#              an integer position array replaces the obj -> index dictionary
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+from array import array
+import random
+from time import time
+import heapq
+import numpy as np
+import MinHeap
+
+
+class Handle(object):
+    """
+    Handle of an object in an ArrayMinHeap, for the priority queue protocol
+    (see PriorityQueue).  The heap itself stores no Element objects.
+
+    self.obj: the object id (a non-negative integer)
+    """
+    __slots__ = ('_heap', 'obj')
+
+    def __init__(self, heap, obj):
+        self._heap, self.obj = heap, obj
+
+    @property
+    def priority(self):
+        return self._heap._key[self.obj]
+
+    def get_value(self):
+        """
+        :return: object id of this handle
+        """
+        return self.obj
+
+    def get_priority(self):
+        """
+        :return: priority of the object (its last priority, once removed from the heap)
+        """
+        return self._heap._key[self.obj]
+
+    def __repr__(self):
+        return str(self)
+
+    def __str__(self):
+        return "({}, {})".format(self.obj, self.priority)
+
+
+class ArrayMinHeap(object):
+    """
+    Binary min heap of integer object ids.
+
+    self._heap: object ids in heap order, array('l')
+    self._priorities: priorities in heap order, array('d'), so comparisons are float compares
+    self._position: index in the heap of each object id, -1 if not in the heap
+    self._key: current (or last) priority of each object id
+
+    Objects must be non-negative integers (e.g., vertex ids); the position and key
+    arrays grow to the largest id pushed.  Sifting moves a hole down (or up) the heap
+    instead of swapping, so every level costs one write per array.
+
+    push, pop, decrease and priority work on plain ids; insert, extract_min, decrease_key,
+    etc. implement the priority queue protocol on top of them with Handles.
+    """
+
+    def __init__(self):
+        self._heap = array('l')
+        self._priorities = array('d')
+        self._position = array('l')
+        self._key = array('d')
+
+    def _reserve(self, obj):
+        if obj < 0:
+            raise ValueError("Object ids must be non-negative integers, got %s!" % obj)
+        missing = obj + 1 - len(self._position)
+        if missing > 0:
+            grow = max(missing, len(self._position))  # amortized O(1)
+            self._position.extend(array('l', [-1]) * grow)
+            self._key.extend(array('d', [np.nan]) * grow)
+
+    def __contains__(self, obj):
+        return 0 <= obj < len(self._position) and self._position[obj] >= 0
+
+    def _index(self, obj):
+        """
+        :return: position of object id obj in the heap, raises KeyError if it is not in the heap
+        """
+        index = self._position[obj] if 0 <= obj < len(self._position) else -1
+        if index < 0:
+            raise KeyError("Object %s no longer in heap!" % obj)
+        return index
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, obj, priority):
+        """Push object id obj with the given priority, maintaining the heap invariant."""
+        if obj in self:
+            raise ValueError("Push: object %s is already in the heap!" % obj)
+        self._reserve(obj)
+        self._key[obj] = priority
+        self._heap.append(obj)
+        self._priorities.append(priority)
+        self._sift_up(len(self._heap) - 1, obj, priority)
+
+    def pop(self):
+        """
+        Pop the object with the smallest priority.
+
+        :return: (object id, priority)
+        """
+        heap = self._heap
+        if not len(heap):
+            raise IndexError("Pop: Heap is empty!")
+        obj, priority = heap[0], self._priorities[0]
+        last, last_priority = heap.pop(), self._priorities.pop()
+        self._position[obj] = -1
+        if len(heap):
+            self._sift_down(0, last, last_priority)
+        return obj, priority
+
+    def priority(self, obj):
+        """
+        :return: current priority of object id obj, raises KeyError if it is not in the heap
+        """
+        if obj not in self:
+            raise KeyError("Object %s no longer in heap!" % obj)
+        return self._key[obj]
+
+    def decrease(self, obj, new_priority):
+        """Decrease the priority of object id obj, maintaining the heap invariant."""
+        index = self._index(obj)
+        if new_priority > self._priorities[index]:
+            raise ValueError("Decrease key: new priority value (%s) must "
+                             "be less than old priority (%s)!"
+                             % (new_priority, self._priorities[index]))
+        self._key[obj] = new_priority
+        self._sift_up(index, obj, new_priority)
+
+    def update(self, obj, new_priority):
+        """Change the priority of object id obj, in either direction."""
+        index = self._index(obj)
+        old_priority = self._priorities[index]
+        self._key[obj] = new_priority
+        if new_priority < old_priority:
+            self._sift_up(index, obj, new_priority)
+        else:
+            self._sift_down(index, obj, new_priority)
+
+    def remove(self, obj):
+        """Remove object id obj from the heap."""
+        index = self._index(obj)
+        self._position[obj] = -1
+        last, last_priority = self._heap.pop(), self._priorities.pop()
+        if index < len(self._heap):
+            if last_priority < self._priorities[index]:
+                self._sift_up(index, last, last_priority)
+            else:
+                self._sift_down(index, last, last_priority)
+
+    def _sift_up(self, index, obj, priority):
+        """Move the hole at index up to the place of (obj, priority), and fill it."""
+        heap, priorities, position = self._heap, self._priorities, self._position
+        while index > 0:
+            parent = (index - 1) >> 1
+            parent_priority = priorities[parent]
+            if priority < parent_priority:
+                parent_obj = heap[parent]
+                heap[index] = parent_obj
+                priorities[index] = parent_priority
+                position[parent_obj] = index
+                index = parent
+            else:
+                break
+        heap[index] = obj
+        priorities[index] = priority
+        position[obj] = index
+
+    def _sift_down(self, index, obj, priority):
+        """Move the hole at index down to the place of (obj, priority), and fill it."""
+        heap, priorities, position = self._heap, self._priorities, self._position
+        n = len(self)
+        child = 2 * index + 1
+        while child < n:
+            child_priority = priorities[child]
+            right = child + 1
+            if right < n and priorities[right] < child_priority:
+                child, child_priority = right, priorities[right]
+            if child_priority < priority:
+                child_obj = heap[child]
+                heap[index] = child_obj
+                priorities[index] = child_priority
+                position[child_obj] = index
+                index = child
+                child = 2 * index + 1
+            else:
+                break
+        heap[index] = obj
+        priorities[index] = priority
+        position[obj] = index
+
+    def _k_smallest(self, k):
+        """
+        :return: the indices of the (at most) k smallest objects, in increasing order of priority
+        """
+        priorities, n = self._priorities, len(self)
+        smallest = []
+        frontier = [(priorities[0], 0)] if n and k > 0 else []
+        while frontier and len(smallest) < k:
+            index = heapq.heappop(frontier)[1]
+            smallest.append(index)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < n:
+                    heapq.heappush(frontier, (priorities[child], child))
+        return smallest
+
+    # priority queue protocol, see PriorityQueue
+
+    def insert(self, obj, priority):
+        self.push(obj, priority)
+        return Handle(self, obj)
+
+    def extract_min(self):
+        return Handle(self, self.pop()[0])
+
+    def extract_k_min(self, k):
+        return [self.extract_min() for _ in xrange(min(k, len(self)))]
+
+    def peek_k_smallest(self, k):
+        return [Handle(self, self._heap[i]) for i in self._k_smallest(k)]
+
+    def decrease_key(self, x, new_priority):
+        self.decrease(x.obj, new_priority)
+
+    def decrease_keys(self, batch):
+        for x, new_priority in batch:
+            if new_priority < self._key[x.obj]:
+                self.decrease(x.obj, new_priority)
+
+    def update_priority(self, x, new_priority):
+        self.update(x.obj, new_priority)
+
+    def delete(self, x):
+        self.remove(x.obj)
+
+    def __getitem__(self, obj):
+        if obj not in self:
+            raise KeyError("Object %s no longer in heap!" % obj)
+        return Handle(self, obj)
+
+    def get(self, obj, default=None):
+        """
+        Exception-free version of heap[obj]
+
+        :return: the handle of obj if it is in the heap, default otherwise
+        """
+        if obj in self:
+            return Handle(self, obj)
+        return default
+
+
+def test_sort(n):
+    heap = ArrayMinHeap()
+
+    correct_result = []
+    for i in xrange(n):
+        priority = random.randint(0, 100) + random.random()
+        correct_result.append((i, priority))
+        heap.push(i, priority)
+
+    for i in random.sample(xrange(n), n // 2):
+        priority = correct_result[i][1] - random.random()
+        correct_result[i] = (i, priority)
+        heap.decrease(i, priority)
+
+    correct_result.sort(key=lambda x: x[1])
+
+    test_result = []
+    while len(heap):
+        test_result.append(heap.pop())
+
+    # popped and never inserted ids are rejected without touching the heap
+    heap.push(0, 1.0)
+    rejected = 0
+    for obj in [1, n + 10]:
+        for change in [lambda: heap.decrease(obj, 0.5), lambda: heap.update(obj, 0.5),
+                       lambda: heap.remove(obj)]:
+            try:
+                change()
+            except KeyError:
+                rejected += 1
+    test_result.append(rejected == 6 and heap.pop() == (0, 1.0) and not len(heap))
+
+    if test_result == correct_result + [True]:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(sizes=(10 ** 5, 10 ** 6, 10 ** 7), seed=0):
+    """
+    Throughput (operations per second) of push, decrease_key and pop on MinHeap and
+    ArrayMinHeap: n pushes, n / 2 decrease keys of random items, then n pops.
+    """
+    print '\t'.join(['heap', 'size', 'push/s', 'decrease_key/s', 'pop/s'])
+    for n in sizes:
+        rng = np.random.RandomState(seed)
+        priorities = rng.random_sample(n).tolist()
+        targets = rng.randint(0, n, n // 2).tolist()
+        deltas = rng.random_sample(n // 2).tolist()
+
+        heap = MinHeap.MinHeap()
+        elems = [MinHeap.Element(i, priority) for i, priority in enumerate(priorities)]
+        times = []
+        start = time()
+        for elem in elems:
+            heap.push(elem)
+        times.append(time() - start)
+        start = time()
+        for i, delta in zip(targets, deltas):
+            heap.decrease_key(elems[i], elems[i].priority - delta)
+        times.append(time() - start)
+        start = time()
+        while len(heap):
+            heap.pop()
+        times.append(time() - start)
+        del heap, elems
+        print '\t'.join(['MinHeap', str(n)] + ['{:0.0f}'.format(m / t) for m, t in zip([n, n // 2, n], times)])
+
+        heap = ArrayMinHeap()
+        key = list(priorities)
+        times = []
+        start = time()
+        for i, priority in enumerate(priorities):
+            heap.push(i, priority)
+        times.append(time() - start)
+        start = time()
+        for i, delta in zip(targets, deltas):
+            key[i] -= delta
+            heap.decrease(i, key[i])
+        times.append(time() - start)
+        start = time()
+        while len(heap):
+            heap.pop()
+        times.append(time() - start)
+        del heap
+        print '\t'.join(['ArrayMinHeap', str(n)] + ['{:0.0f}'.format(m / t) for m, t in zip([n, n // 2, n], times)])
+
+
+if __name__ == '__main__':
+    test_sort(1000)
+    benchmark()
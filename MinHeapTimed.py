@@ -10,6 +10,7 @@
 # -------------------------------------------------------------------------------
 
 import random
+import heapq
 from FibonacciHeapTimed import count
 
 
@@ -52,6 +53,22 @@ class MinHeap(object):
         self._heap = []
         self._dict = {}  # keeps track of the the position of each item
 
+    @count
+    def __contains__(self, item):
+        return item in self._dict
+
+    @count
+    def get(self, item, default=None):
+        """
+        Exception-free version of heap[item]
+
+        :return: the element holding item if it is in the heap, default otherwise
+        """
+        index = self._dict.get(item)
+        if index is None:
+            return default
+        return self._heap[index]
+
     @count
     def push(self, item):
         """Push item onto heap, maintaining the heap invariant."""
@@ -76,6 +93,88 @@ class MinHeap(object):
         else:
             raise IndexError("Pop: Heap is empty!")
 
+    @count
+    def replace(self, item):
+        """
+        Pop the smallest item and push the new item in a single bubble down.
+        Unlike pushpop, the smallest item is returned even if it is larger than item.
+        """
+        assert isinstance(item, Element), \
+            "Replace: Invalid element!"
+        if not len(self._heap):
+            raise IndexError("Replace: Heap is empty!")
+        min_item = self._heap[0]
+        del self._dict[min_item.obj]
+        self._heap[0] = item
+        self._dict[item.obj] = 0
+        self._bubble_down(0)
+        return min_item
+
+    @count
+    def pushpop(self, item):
+        """
+        Push item and then pop the smallest item, in a single bubble down.
+        If item is not larger than the smallest item, it is returned right away.
+        """
+        if len(self._heap) and self._heap[0] < item:
+            return self.replace(item)
+        return item
+
+    @count
+    def pop_many(self, k):
+        """
+        Pop the k smallest items (all of them if the heap has fewer).  If k is large
+        relative to the heap (more than n / log(n) items), the k smallest are found by a
+        best-first search (see peek_k_smallest) and the rest of the heap is rebuilt
+        with one O(n) heapify pass, instead of bubbling down after every pop.
+
+        :param k: number of items to pop
+        :return: list of the popped items in increasing order of priority
+        """
+        n = len(self._heap)
+        k = min(k, n)
+        if k <= n // max(1, n.bit_length()):
+            return [self.pop() for _ in xrange(k)]
+
+        indices = self._k_smallest(k)
+        items = [self._heap[i] for i in indices]
+        taken = set(indices)
+
+        self._heap = [item for i, item in enumerate(self._heap) if i not in taken]
+        for item in items:
+            del self._dict[item.obj]
+        for i, item in enumerate(self._heap):
+            self._dict[item.obj] = i
+        self._heapify()
+
+        return items
+
+    @count
+    def peek_k_smallest(self, k):
+        """
+        Non-destructive version of pop_many, in O(k log k) time by exploring
+        the heap best-first with an auxiliary heap.
+
+        :param k: number of items
+        :return: list of the (at most) k items with the smallest priorities, in increasing order
+        """
+        return [self._heap[i] for i in self._k_smallest(k)]
+
+    def _k_smallest(self, k):
+        """
+        :return: the indices of the (at most) k smallest items, in increasing order of priority
+        """
+        heap = self._heap
+        smallest = []
+        frontier = [(heap[0].priority, 0)] if heap and k > 0 else []
+        while frontier and len(smallest) < k:
+            index = heapq.heappop(frontier)[1]
+            smallest.append(index)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child].priority, child))
+        return smallest
+
     @count
     def decrease_key(self, item, new_priority):
         """Pop the smallest item off the heap, maintaining the heap invariant."""
@@ -87,11 +186,83 @@ class MinHeap(object):
         item.priority = new_priority
         self._bubble_up(self._dict[item.obj])
 
+    @count
+    def update_priority(self, item, new_priority):
+        """
+        Change the priority of item, in either direction: the item is
+        bubbled up after a decrease and bubbled down after an increase.
+        """
+        old_priority = item.priority
+        item.priority = new_priority
+        if new_priority < old_priority:
+            self._bubble_up(self._dict[item.obj])
+        elif new_priority > old_priority:
+            self._bubble_down(self._dict[item.obj])
+
+    @count
+    def decrease_keys(self, batch):
+        """
+        Decrease the priorities of several items at once, e.g. all the neighbors of
+        a vertex in Prim's or Dijkstra's algorithm.  If the batch is large relative to
+        the heap (more than n / log(n) items), the heap is repaired with a single O(n)
+        heapify pass instead of bubbling up every item.
+        Pairs whose new priority is not less than the current one are ignored,
+        so an item may appear more than once in the batch.
+
+        :param batch: list of (item, new priority) pairs
+        """
+        n = len(self._heap)
+        if len(batch) > n // max(1, n.bit_length()):
+            for item, new_priority in batch:
+                if new_priority < item.priority:
+                    item.priority = new_priority
+            self._heapify()
+        else:
+            for item, new_priority in batch:
+                if new_priority < item.priority:
+                    item.priority = new_priority
+                    self._bubble_up(self._dict[item.obj])
+
+    @count
+    def merge(self, heap):
+        """
+        Merge another MinHeap into this one; the other heap is emptied.
+        A heap small relative to the result (at most n / log(n) items) is pushed item
+        by item; otherwise its items are appended, their positions fixed up, and the
+        whole heap is rebuilt with one O(n) heapify pass.
+
+        :param heap: another MinHeap, with none of the objects of this one
+        """
+        assert isinstance(heap, MinHeap), \
+            "Invalid heap!"
+        items = heap._heap
+        for item in items:
+            if item.obj in self._dict:
+                raise ValueError("Merge: object %s is in both heaps!" % item.obj)
+
+        n = len(self._heap) + len(items)
+        if len(items) <= n // max(1, n.bit_length()):
+            for item in items:
+                self.push(item)
+        else:
+            offset = len(self._heap)
+            self._heap.extend(items)
+            for i, item in enumerate(items, offset):
+                self._dict[item.obj] = i
+            self._heapify()
+
+        heap._heap, heap._dict = [], {}
+
     def _swap(self, i, j):
         self._dict[self._heap[i].obj] = j
         self._dict[self._heap[j].obj] = i
         self._heap[i], self._heap[j] = self._heap[j], self._heap[i]
 
+    def _heapify(self):
+        """Restore the heap invariant over the whole heap in O(n)."""
+        for index in xrange(len(self._heap) // 2 - 1, -1, -1):
+            self._bubble_down(index)
+
     def _bubble_down(self, index):
         while index < len(self._heap):
             left_child_index = index * 2 + 1
@@ -0,0 +1,303 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        PersistentSkipList
+# Purpose:     Skip List whose nodes live in a memory-mapped file as fixed-size
+#              records linked by record indices instead of object pointers, so
+#              the index survives restarts and reopens in O(1) without a rebuild
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import mmap
+import os
+import random
+import struct
+from time import time
+import numpy as np
+from SkipList import SkipList
+
+# file: header, then fixed-size records of (key, value, level, forward[max_level])
+MAGIC = 'PSKIPLS1'
+HEADER = struct.Struct('<8sIIqqqq')  # magic, max level, record size, level, size, records, free list
+NODE = struct.Struct('<dqi')  # key, value, level of the node
+KEY = struct.Struct('<d')
+VALUE = struct.Struct('<q')
+POINTER = struct.Struct('<i')  # record index
+
+HEAD, TAIL, NIL = 0, 1, -1
+
+
+class PersistentSkipList(object):
+    """
+    Skip List of float keys and integer values stored in a file.
+
+    Every node is a record of the same size holding its key, value, level and max_level
+    forward pointers (the record indices of the next nodes, levels 0 indexed as in SkipList).
+    Record 0 is the head (key -inf) and record 1 the tail (key +inf).  The records of
+    deleted nodes are kept in a free list, linked by their level 0 pointer, and reused.
+    search, insert and delete read and write the records directly in the mapping;
+    the file grows by doubling.
+    """
+
+    def __init__(self, filename, max_level=24, capacity=1024, seed=None):
+        """
+        Open the skip list stored in filename, or create it if the file does not exist.
+
+        :param max_level: maximal level of a node, for a new file (about 2^max_level nodes)
+        :param capacity: number of records of a new file
+        :param seed: seed of the random levels
+        """
+        self.filename = filename
+        self._random = random.Random(seed)
+
+        if os.path.exists(filename):
+            self._file = open(filename, 'r+b')
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, self._max_level, self._record_size, self._level, self._size, \
+                self._records, self._free = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("%s is not a persistent skip list!" % filename)
+        else:
+            self._max_level = max_level
+            self._record_size = NODE.size + POINTER.size * max_level
+            self._level, self._size, self._records, self._free = 1, 0, 2, NIL
+            capacity = max(capacity, 2)
+            self._file = open(filename, 'w+b')
+            self._file.truncate(HEADER.size + capacity * self._record_size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self._write_node(HEAD, -np.inf, 0, max_level)
+            self._write_node(TAIL, np.inf, 0, 0)
+            for i in xrange(max_level):
+                self._set_forward(HEAD, i, TAIL)
+            self._write_header()
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, self._max_level, self._record_size, self._level,
+                         self._size, self._records, self._free)
+
+    def _offset(self, node):
+        return HEADER.size + node * self._record_size
+
+    def _write_node(self, node, key, value, level):
+        NODE.pack_into(self._map, self._offset(node), key, value, level)
+
+    def _key(self, node):
+        return KEY.unpack_from(self._map, self._offset(node))[0]
+
+    def _forward(self, node, i):
+        return POINTER.unpack_from(self._map, self._offset(node) + NODE.size + POINTER.size * i)[0]
+
+    def _set_forward(self, node, i, target):
+        POINTER.pack_into(self._map, self._offset(node) + NODE.size + POINTER.size * i, target)
+
+    def _allocate(self):
+        """
+        :return: index of a free record, from the free list or the end of the file
+        """
+        if self._free != NIL:
+            node = self._free
+            self._free = self._forward(node, 0)
+            return node
+        capacity = (len(self._map) - HEADER.size) // self._record_size
+        if self._records == capacity:
+            self._map.resize(HEADER.size + 2 * capacity * self._record_size)
+        self._records += 1
+        return self._records - 1
+
+    def search(self, key):
+        """
+        Find the node with the given key
+        :param key: search key
+        :return: value associated with the searched key if found, None otherwise
+        """
+        m, record_size, forward_offset = self._map, self._record_size, HEADER.size + NODE.size
+        key_at, pointer_at = KEY.unpack_from, POINTER.unpack_from
+        x = HEAD
+
+        for i in xrange(self._level-1, -1, -1):
+            while True:
+                y = pointer_at(m, forward_offset + x * record_size + POINTER.size * i)[0]
+                if key_at(m, HEADER.size + y * record_size)[0] < key:
+                    x = y
+                else:
+                    break
+
+        # y is the next node after the last predecessor on the last level
+        if key_at(m, HEADER.size + y * record_size)[0] == key:
+            return VALUE.unpack_from(m, HEADER.size + y * record_size + KEY.size)[0]
+        else:
+            return None
+
+    def insert(self, key, val):
+        update = self._update(key)
+        x = self._forward(update[0], 0)
+        if self._key(x) == key:
+            VALUE.pack_into(self._map, self._offset(x) + KEY.size, val)
+        else:
+            new_level = self._random_level()
+            if new_level >= self._level:
+                # update[i] already points to the head for the new levels
+                self._level = new_level + 1
+            x = self._allocate()
+            self._write_node(x, key, val, new_level + 1)
+            for i in xrange(new_level+1):
+                self._set_forward(x, i, self._forward(update[i], i))
+                self._set_forward(update[i], i, x)
+            self._size += 1
+        self._write_header()
+
+    def delete(self, key):
+        update = self._update(key)
+        x = self._forward(update[0], 0)
+        if self._key(x) == key:
+            for i in xrange(self._level):
+                if self._forward(update[i], i) != x:
+                    break
+                self._set_forward(update[i], i, self._forward(x, i))
+            while self._level > 1 and self._forward(HEAD, self._level-1) == TAIL:
+                self._level -= 1
+            self._set_forward(x, 0, self._free)
+            self._free = x
+            self._size -= 1
+            self._write_header()
+
+    def _update(self, key):
+        """
+        :param key: search key
+        :return: a vector of records on each level such that each record is the closest predecessor
+        """
+        m, record_size, forward_offset = self._map, self._record_size, HEADER.size + NODE.size
+        key_at, pointer_at = KEY.unpack_from, POINTER.unpack_from
+        x = HEAD
+        update = [HEAD] * self._max_level
+
+        for i in xrange(self._level-1, -1, -1):
+            while True:
+                y = pointer_at(m, forward_offset + x * record_size + POINTER.size * i)[0]
+                if key_at(m, HEADER.size + y * record_size)[0] < key:
+                    x = y
+                else:
+                    break
+            update[i] = x
+
+        return update
+
+    def _random_level(self, p=0.5):
+        """
+        Randomly determine the level of a node.  Flip a coin with probablity p that it
+        is heads until it becomes tails.
+        :return:
+        """
+        level = 0
+        while self._random.random() < p and level < self._max_level - 1:
+            level += 1
+        return level
+
+    def items(self):
+        """
+        :return: iterator of (key, value) pairs in increasing order of key
+        """
+        x = self._forward(HEAD, 0)
+        while x != TAIL:
+            key, value, _ = NODE.unpack_from(self._map, self._offset(x))
+            yield key, value
+            x = self._forward(x, 0)
+
+    def flush(self):
+        """Write the changes to the file."""
+        self._map.flush()
+
+    def close(self):
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        """
+        :return: number of nodes in the skip list
+        """
+        return self._size
+
+    def size(self):
+        """
+        :return: number of nodes in the skip list
+        """
+        return len(self)
+
+    def level(self):
+        """
+        :return: the highest level in the skip list
+        """
+        return self._level
+
+
+def test_persistence(filename, n):
+    if os.path.exists(filename):
+        os.remove(filename)
+    expected = {}
+    skiplist = PersistentSkipList(filename, capacity=16, seed=0)
+    for key in np.random.RandomState(0).randint(0, n, n).tolist():
+        skiplist.insert(float(key), key * 2)
+        expected[float(key)] = key * 2
+    for key in expected.keys()[::3]:
+        skiplist.delete(key)
+        del expected[key]
+    skiplist.close()
+
+    skiplist = PersistentSkipList(filename)
+    ok = list(skiplist.items()) == sorted(expected.items()) and len(skiplist) == len(expected)
+    ok = ok and all(skiplist.search(key) == value for key, value in expected.iteritems())
+    ok = ok and skiplist.search(-1.0) is None and skiplist.search(n + 0.5) is None
+    skiplist.close()
+    os.remove(filename)
+
+    if ok:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(n=10 ** 5, lookups=10 ** 5, filename='PersistentSkipList.bin', seed=0):
+    """
+    Cold start (reopening the file against rebuilding the in-memory SkipList from the
+    source data) and lookup latency of both.
+    """
+    rng = np.random.RandomState(seed)
+    keys = rng.random_sample(n).tolist()
+    queries = [keys[i] for i in rng.randint(0, n, lookups).tolist()]
+
+    if os.path.exists(filename):
+        os.remove(filename)
+    start = time()
+    skiplist = PersistentSkipList(filename, seed=seed)
+    for i, key in enumerate(keys):
+        skiplist.insert(key, i)
+    skiplist.close()
+    print 'persistent build: {:0.3f} secs, file {:d} bytes'.format(time() - start, os.path.getsize(filename))
+
+    start = time()
+    skiplist = PersistentSkipList(filename)
+    reopen_time = time() - start
+
+    start = time()
+    memory = SkipList()
+    for i, key in enumerate(keys):
+        memory.insert(key, i)
+    rebuild_time = time() - start
+    print 'cold start: reopen {:0.6f} secs, in-memory rebuild {:0.3f} secs'.format(reopen_time, rebuild_time)
+
+    for name, index in [('persistent', skiplist), ('in-memory', memory)]:
+        start = time()
+        for key in queries:
+            index.search(key)
+        print '{} lookup: {:0.2f} us'.format(name, (time() - start) / lookups * 1e6)
+
+    skiplist.close()
+    os.remove(filename)
+
+
+if __name__ == '__main__':
+    test_persistence('PersistentSkipList.bin', 10000)
+    benchmark()
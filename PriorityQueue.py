@@ -0,0 +1,175 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        PriorityQueue
+# Purpose:     Common priority queue protocol for the heaps in this repository
+#              and a registry of heap backends, so that one implementation of
+#              an algorithm (e.g., Prim's) runs over any heap selected by name
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import numpy as np
+import FibonacciHeap
+import FibonacciHeapTimed
+import MinHeap
+import MinHeapTimed
+import MinHeapArray
+import LeftistHeap
+import HollowHeap
+
+# The priority queue protocol is the interface of FibonacciHeap:
+#
+#     heap.insert(obj, priority) -> handle
+#     heap.extract_min() -> handle of the minimal element, removed from the heap
+#     heap.extract_k_min(k) -> handles of the k minimal elements, removed from the heap
+#     heap.peek_k_smallest(k) -> handles of the k minimal elements, left in the heap
+#     heap.decrease_key(handle, new_priority)
+#     heap.decrease_keys([(handle, new_priority), ...]), skipping pairs that do not decrease
+#     heap.update_priority(handle, new_priority), in either direction
+#     heap.delete(handle)
+#     heap[obj] -> handle, raises KeyError if obj is not in the heap
+#     heap.get(obj, default=None) -> handle, or default if obj is not in the heap
+#     obj in heap
+#     len(heap)
+#
+# Mergeable heaps (fibheap, minheap, leftist, hollow) also have heap.merge(other), which moves
+# every element of another heap of the same kind into heap and empties other.
+#
+# A handle has the attributes obj and priority, and the method get_priority().
+
+
+class _MinHeapProtocol(object):
+    """
+    Adds the priority queue protocol to a MinHeap class
+    """
+    element_class = None
+
+    def insert(self, x, priority):
+        elem = self.new_element(x, priority)
+        self.push(elem)
+        return elem
+
+    def extract_min(self):
+        return self.pop()
+
+    def extract_k_min(self, k):
+        return self.pop_many(k)
+
+    def delete(self, x):
+        self.decrease_key(x, -np.inf)
+        self.pop()
+
+
+class MinHeapAdapter(_MinHeapProtocol, MinHeap.MinHeap):
+    element_class = MinHeap.Element
+
+
+class TimedMinHeapAdapter(_MinHeapProtocol, MinHeapTimed.MinHeap):
+    element_class = MinHeapTimed.Element
+
+    def new_element(self, x, priority):
+        # the timed copy keeps the reference allocation behaviour, without a pool
+        return self.element_class(x, priority)
+
+
+# the protocol methods Prim's algorithm calls, counted by the derived timed variants
+TIMED_METHODS = ['insert', 'extract_min', 'decrease_key', 'decrease_keys', 'update_priority', 'get']
+
+
+def timed_variant(cls, methods=TIMED_METHODS):
+    """
+    Derive the timed variant of a heap class that has no hand-written timed copy:
+    a subclass whose given methods are decorated with count (see FibonacciHeapTimed).
+
+    :param cls: a heap class implementing the protocol
+    :param methods: names of the methods to count
+    :return: the subclass
+    """
+    counted = dict((method, FibonacciHeapTimed.count(getattr(cls, method))) for method in methods)
+    return type('Timed' + cls.__name__, (cls,), counted)
+
+
+class Backend(object):
+    """
+    A registered heap.
+
+    self.name: name the heap is selected by
+    self.factory: creates an empty heap implementing the protocol
+    self.timed_factory: creates an empty heap whose methods are decorated with count
+    self.timed_methods: names of the counted methods, reported by heap_stats
+    """
+
+    def __init__(self, name, factory, timed_factory=None, timed_methods=()):
+        self.name = name
+        self.factory = factory
+        self.timed_factory = timed_factory
+        self.timed_methods = list(timed_methods)
+
+
+BACKENDS = {}
+
+
+def register_backend(name, factory, timed_factory=None, timed_methods=()):
+    """
+    Register a heap under name.  Every algorithm and benchmark that sweeps over
+    backends() picks it up.
+
+    :param name: name the heap is selected by
+    :param factory: callable creating an empty heap that implements the protocol
+    :param timed_factory: callable creating an empty heap with counted methods, if any
+    :param timed_methods: names of the counted methods
+    """
+    BACKENDS[name] = Backend(name, factory, timed_factory, timed_methods)
+
+
+def backends():
+    """
+    :return: names of all registered heaps
+    """
+    return sorted(BACKENDS)
+
+
+def has_timed(name):
+    """
+    :return: True if the named backend has a variant with counted methods
+    """
+    return BACKENDS[name].timed_factory is not None
+
+
+def create(name, timed=False):
+    """
+    Create an empty heap of the named backend.
+
+    :param name: a registered backend
+    :param timed: return the variant with counted methods, if the backend has one
+    :return: an empty heap implementing the protocol
+    """
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown heap backend %s!" % name)
+    if timed and backend.timed_factory is not None:
+        return backend.timed_factory()
+    return backend.factory()
+
+
+def heap_stats(name, heap):
+    """
+    :return: {method name: (number of calls, total time)} of a heap created with timed=True
+    """
+    stats = {}
+    for method in BACKENDS[name].timed_methods:
+        fn = getattr(heap, method)
+        stats[fn.__name__] = (fn.called, fn.time)
+    return stats
+
+
+register_backend('fibheap', FibonacciHeap.FibonacciHeap, FibonacciHeapTimed.FibonacciHeap,
+                 ['insert', 'extract_min', 'decrease_key', 'decrease_keys', 'update_priority', 'get'])
+register_backend('minheap', MinHeapAdapter, TimedMinHeapAdapter,
+                 ['push', 'pop', 'decrease_key', 'decrease_keys', 'update_priority', 'get'])
+register_backend('arrayheap', MinHeapArray.ArrayMinHeap, timed_variant(MinHeapArray.ArrayMinHeap), TIMED_METHODS)
+register_backend('leftist', LeftistHeap.LeftistHeap, timed_variant(LeftistHeap.LeftistHeap), TIMED_METHODS)
+register_backend('hollow', HollowHeap.HollowHeap, timed_variant(HollowHeap.HollowHeap), TIMED_METHODS)
@@ -0,0 +1,233 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        SharedMinHeap
+# Purpose:     ArrayMinHeap whose arrays live in shared memory, so that several
+#              worker processes push to and pop from one priority queue without
+#              pickling the items or going through a manager process
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import multiprocessing
+from multiprocessing.managers import BaseManager
+from multiprocessing.sharedctypes import RawArray, RawValue
+import threading
+from time import time
+import numpy as np
+import MinHeapArray
+
+
+class SharedMinHeap(MinHeapArray.ArrayMinHeap):
+    """
+    ArrayMinHeap of fixed capacity over shared memory.
+
+    The ids and priorities in heap order, the position index and the keys of the ids are
+    RawArrays and the number of items a RawValue, all guarded by one multiprocessing Lock:
+    every method holds the lock while it reads or writes the arrays.  Create the heap
+    before starting the workers and pass it to them as an argument of Process, so they
+    inherit the shared memory.
+
+    Object ids must be in 0 .. id_capacity - 1.
+    """
+
+    def __init__(self, capacity, id_capacity=None):
+        """
+        :param capacity: maximal number of items in the heap at the same time
+        :param id_capacity: number of distinct object ids, capacity by default
+        """
+        id_capacity = capacity if id_capacity is None else id_capacity
+        self._heap = RawArray('l', capacity)
+        self._priorities = RawArray('d', capacity)
+        self._position = RawArray('l', id_capacity)
+        self._position[:] = [-1] * id_capacity
+        self._key = RawArray('d', id_capacity)
+        self._count = RawValue('l', 0)
+        self._lock = multiprocessing.Lock()
+
+    def _reserve(self, obj):
+        if not 0 <= obj < len(self._position):
+            raise ValueError("Object id %s outside of the shared heap (0 .. %d)!"
+                             % (obj, len(self._position) - 1))
+
+    def __len__(self):
+        return self._count.value
+
+    def push(self, obj, priority):
+        """Push object id obj with the given priority, maintaining the heap invariant."""
+        with self._lock:
+            self._reserve(obj)
+            if self._position[obj] >= 0:
+                raise ValueError("Push: object %s is already in the heap!" % obj)
+            n = self._count.value
+            if n == len(self._heap):
+                raise IndexError("Push: Heap is full!")
+            self._key[obj] = priority
+            self._count.value = n + 1
+            self._sift_up(n, obj, priority)
+
+    def pop(self):
+        """
+        Pop the object with the smallest priority.
+
+        :return: (object id, priority)
+        """
+        with self._lock:
+            n = self._count.value
+            if not n:
+                raise IndexError("Pop: Heap is empty!")
+            heap, priorities = self._heap, self._priorities
+            obj, priority = heap[0], priorities[0]
+            n -= 1
+            self._count.value = n
+            self._position[obj] = -1
+            if n:
+                self._sift_down(0, heap[n], priorities[n])
+            return obj, priority
+
+    def try_pop(self):
+        """
+        Exception-free pop, as another process may empty the heap between a
+        len check and a pop.
+
+        :return: (object id, priority), or None if the heap is empty
+        """
+        try:
+            return self.pop()
+        except IndexError:
+            return None
+
+    def priority(self, obj):
+        with self._lock:
+            return super(SharedMinHeap, self).priority(obj)
+
+    def decrease(self, obj, new_priority):
+        with self._lock:
+            super(SharedMinHeap, self).decrease(obj, new_priority)
+
+    def update(self, obj, new_priority):
+        with self._lock:
+            super(SharedMinHeap, self).update(obj, new_priority)
+
+    def remove(self, obj):
+        """Remove object id obj from the heap."""
+        with self._lock:
+            index = self._index(obj)
+            self._position[obj] = -1
+            n = self._count.value - 1
+            self._count.value = n
+            if index < n:
+                last, last_priority = self._heap[n], self._priorities[n]
+                if last_priority < self._priorities[index]:
+                    self._sift_up(index, last, last_priority)
+                else:
+                    self._sift_down(index, last, last_priority)
+
+    def peek_k_smallest(self, k):
+        with self._lock:
+            return super(SharedMinHeap, self).peek_k_smallest(k)
+
+
+class _LockedArrayMinHeap(MinHeapArray.ArrayMinHeap):
+    """
+    ArrayMinHeap served by a manager: the manager runs the calls of every
+    client in its own thread, so push and pop are serialized with a lock.
+    """
+
+    def __init__(self):
+        super(_LockedArrayMinHeap, self).__init__()
+        self._lock = threading.Lock()
+
+    def push(self, obj, priority):
+        with self._lock:
+            super(_LockedArrayMinHeap, self).push(obj, priority)
+
+    def try_pop(self):
+        with self._lock:
+            if len(self):
+                return self.pop()
+            return None
+
+
+class HeapManager(BaseManager):
+    pass
+
+
+HeapManager.register('ArrayMinHeap', _LockedArrayMinHeap)
+
+
+def _worker(heap, first, priorities):
+    """Push the given priorities with ids from first on, popping after every second push."""
+    for i, priority in enumerate(priorities, first):
+        heap.push(i, priority)
+        if i % 2:
+            heap.try_pop()
+
+
+def _stale_worker(heap, ids, rejected):
+    """Decrease and update the priorities of ids that are no longer in the heap, counting the KeyErrors."""
+    for obj in ids:
+        for change in [heap.decrease, heap.update]:
+            try:
+                change(obj, -1.0)
+            except KeyError:
+                rejected.value += 1
+
+
+def test_processes(workers=4, m=10000):
+    heap = SharedMinHeap(workers * m)
+    rng = np.random.RandomState(0)
+    processes = [multiprocessing.Process(target=_worker, args=(heap, w * m, rng.random_sample(m).tolist()))
+                 for w in xrange(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    # a stale id, popped by one worker, must not corrupt the heap of the others
+    popped = [obj for obj in xrange(workers * m) if obj not in heap]
+    rejected = RawValue('l', 0)
+    p = multiprocessing.Process(target=_stale_worker, args=(heap, popped, rejected))
+    p.start()
+    p.join()
+
+    remaining = [heap.pop() for _ in xrange(len(heap))]
+    priorities = [priority for _, priority in remaining]
+    if len(remaining) == workers * m // 2 and priorities == sorted(priorities) \
+            and rejected.value == 2 * len(popped) and min(priorities) >= 0:
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(m=10 ** 5, workers=(1, 2, 4), seed=0):
+    """
+    Throughput (operations per second, over all processes) of worker processes each doing
+    m pushes and m / 2 pops on one SharedMinHeap, and on an ArrayMinHeap proxied by a manager.
+    """
+    rng = np.random.RandomState(seed)
+    print '\t'.join(['heap', 'workers', 'ops/sec'])
+    for w in workers:
+        chunks = [rng.random_sample(m).tolist() for _ in xrange(w)]
+        manager = HeapManager()
+        manager.start()
+        heaps = [('shared', SharedMinHeap(w * m)), ('manager', manager.ArrayMinHeap())]
+
+        for name, heap in heaps:
+            processes = [multiprocessing.Process(target=_worker, args=(heap, i * m, chunk))
+                         for i, chunk in enumerate(chunks)]
+            start = time()
+            for p in processes:
+                p.start()
+            for p in processes:
+                p.join()
+            elapsed = time() - start
+            print '{}\t{:d}\t{:0.0f}'.format(name, w, w * (m + m // 2) / elapsed)
+
+        manager.shutdown()
+
+
+if __name__ == '__main__':
+    test_processes()
+    benchmark()
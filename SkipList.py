@@ -68,8 +68,9 @@ class SkipList(object):
     def __init__(self):
         random.seed(43)  # for Debugging purposes
         self._size = 0
-        self._head = Node(-np.inf, None)
-        self._tail = Node(np.inf, None)
+        self._tail = Node(np.inf, None, 0)
+        self._head = Node(-np.inf, None, self.MAX_LEVEL)
+        self._head.forward = [self._tail] * self.MAX_LEVEL
         self._level = 1
 
     def search(self, key):
@@ -99,25 +100,26 @@ class SkipList(object):
             x.value = val
         else:
             new_level = self._random_level()
-            if new_level > self._level:
-                for i in xrange(self._level+1, new_level+1):
-                    update[i] = self._head
-                self._level = new_level
-            x = Node(key, val, new_level)
+            if new_level >= self._level:
+                # update[i] already points to the head for the new levels
+                self._level = new_level + 1
+            x = Node(key, val, new_level + 1)
             for i in xrange(new_level+1):
                 x.forward[i] = update[i].forward[i]
                 update[i].forward[i] = x
+            self._size += 1
 
     def delete(self, key):
         update = self._update(key)
         x = update[0].forward[0]
         if x.key == key:
             for i in xrange(self._level):
-                if update[i].forward[i] != x:
+                if update[i].forward[i] is not x:
                     break
                 update[i].forward[i] = x.forward[i]
-            while self._level and self._header.forward[self._level] == self._tail:
+            while self._level > 1 and self._head.forward[self._level-1] is self._tail:
                 self._level -= 1
+            self._size -= 1
 
     def _update(self, key):
         """
@@ -128,9 +130,9 @@ class SkipList(object):
         :return: a vector of nodes on each level such that each node is the closest predecessor
         """
         x = self._head
-        update = [None] * self.MAX_LEVEL
+        update = [self._head] * self.MAX_LEVEL
 
-        for i in xrange(self._level, 0, -1):
+        for i in xrange(self._level-1, -1, -1):
             while x.forward[i].key < key:
                 x = x.forward[i]
             update[i] = x
@@ -144,7 +146,7 @@ class SkipList(object):
         :return:
         """
         level = 0
-        while random.random() < p and level < self.MAX_LEVEL:
+        while random.random() < p and level < self.MAX_LEVEL - 1:
             level += 1
         return level
 
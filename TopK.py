@@ -0,0 +1,211 @@
+#!/usr/bin/python
+# -------------------------------------------------------------------------------
+# Name:        TopK
+# Purpose:     Bounded top-k selection over unbounded streams on MinHeap: at most
+#              k items are kept, the smallest of them at the top of the heap, and
+#              a larger item replaces it in a single bubble down
+# Author:      Di Zhuang
+# Created:     10/18/2026
+# Version:     1.0
+# Copyright:   (c) Di Zhuang 2026
+# -------------------------------------------------------------------------------
+
+import heapq
+from itertools import islice
+from time import time
+import numpy as np
+import MinHeap
+
+
+class Entry(MinHeap.Element):
+    """
+    Element of a TopK.  obj is a unique sequence number (MinHeap keys its position
+    dictionary by obj), the item itself is kept in value, so equal items may be kept.
+    """
+
+    def __init__(self, seq, priority, value):
+        super(Entry, self).__init__(seq, priority)
+        self.value = value
+
+
+class TopK(object):
+    """
+    The k items with the largest priorities seen so far.
+
+    The kept items are in a MinHeap, so its top is the threshold an item must exceed
+    to be kept.  NumPy chunks are prefiltered: at most k candidates of the chunk
+    (by np.argpartition) above the threshold ever reach the heap.
+    """
+
+    def __init__(self, k, key=None):
+        """
+        :param k: number of items to keep
+        :param key: function computing the priority of an item, the item itself by default
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1, got %s!" % k)
+        self.k = k
+        self.key = key
+        self._heap = MinHeap.MinHeap()
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def threshold(self):
+        """
+        :return: the priority an item must exceed to be kept, -inf until k items are kept
+        """
+        if len(self._heap) < self.k:
+            return -np.inf
+        return self._heap._heap[0].priority
+
+    def push(self, item, priority=None):
+        """
+        Offer an item.
+
+        :param priority: priority of the item, key(item) by default
+        :return: True if the item is kept (for now)
+        """
+        if priority is None:
+            priority = self.key(item) if self.key is not None else item
+        heap = self._heap
+        if len(heap) < self.k:
+            heap.push(Entry(self._seq, priority, item))
+        elif priority > heap._heap[0].priority:
+            heap.replace(Entry(self._seq, priority, item))
+        else:
+            return False
+        self._seq += 1
+        return True
+
+    def extend(self, iterable, chunk_size=1 << 12):
+        """
+        Offer every item of an iterable, one chunk at a time: the threshold only
+        changes when an item is kept, so it is checked locally.
+        """
+        key, heap = self.key, self._heap
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            threshold = self.threshold()
+            for item in chunk:
+                priority = key(item) if key is not None else item
+                if priority > threshold:
+                    self.push(item, priority)
+                    if len(heap) == self.k:
+                        threshold = heap._heap[0].priority
+
+    def extend_array(self, priorities, items=None):
+        """
+        Offer a NumPy chunk of priorities, with the items (ids, rows, ...) they belong
+        to, the priorities themselves by default.
+        """
+        priorities = np.asarray(priorities)
+        candidates = np.flatnonzero(priorities > self.threshold())
+        if len(candidates) > self.k:
+            best = np.argpartition(priorities[candidates], len(candidates) - self.k)[-self.k:]
+            candidates = candidates[best]
+        values = priorities[candidates].tolist()
+        kept = values if items is None else np.asarray(items)[candidates].tolist()
+        for item, priority in zip(kept, values):
+            self.push(item, priority)
+
+    def merge(self, other):
+        """
+        Merge the top k of another shard into this one.
+
+        :param other: a TopK
+        """
+        for entry in other._heap._heap:
+            self.push(entry.value, entry.priority)
+
+    def items(self):
+        """
+        :return: list of (item, priority) pairs, largest priority first
+        """
+        entries = sorted(self._heap._heap, key=lambda entry: entry.priority, reverse=True)
+        return [(entry.value, entry.priority) for entry in entries]
+
+
+def test_topk(n, k):
+    rng = np.random.RandomState(0)
+    values = rng.randint(0, n // 10, n)
+    expected = sorted(values.tolist(), reverse=True)[:k]
+
+    streamed = TopK(k)
+    streamed.extend(iter(values.tolist()))
+    chunked = TopK(k)
+    for chunk in np.array_split(values, 7):
+        chunked.extend_array(chunk)
+    shards = [TopK(k) for _ in xrange(3)]
+    for shard, chunk in zip(shards, np.array_split(values, 3)):
+        shard.extend(chunk.tolist())
+    merged = TopK(k)
+    for shard in shards:
+        merged.merge(shard)
+
+    results = [[priority for _, priority in topk.items()] for topk in [streamed, chunked, merged]]
+    if all(result == expected for result in results):
+        print "It works!"
+    else:
+        print "Something is wrong!"
+
+
+def benchmark(n=10 ** 7, ks=(10, 100, 1000, 10 ** 4, 10 ** 5), chunk=10 ** 6, push_all_limit=10 ** 6, seed=0):
+    """
+    Top k of a stream of n random values, generated chunk by chunk: pushing every item
+    into a MinHeap (only up to push_all_limit items), heapq.nlargest, TopK.extend over
+    the items and TopK.extend_array over the NumPy chunks.  n = 10^8 works the same,
+    except for the time.
+    """
+    def chunks():
+        rng = np.random.RandomState(seed)
+        for first in xrange(0, n, chunk):
+            yield rng.random_sample(min(chunk, n - first))
+
+    def stream():
+        for values in chunks():
+            for value in values.tolist():
+                yield value
+
+    def push_all(k):
+        heap = MinHeap.MinHeap()
+        for i, value in enumerate(stream()):
+            heap.push(MinHeap.Element(i, -value))
+        return [-item.priority for item in heap.pop_many(k)]
+
+    def topk_extend(k):
+        topk = TopK(k)
+        for values in chunks():
+            topk.extend(values.tolist())
+        return [priority for _, priority in topk.items()]
+
+    def topk_array(k):
+        topk = TopK(k)
+        for values in chunks():
+            topk.extend_array(values)
+        return [priority for _, priority in topk.items()]
+
+    methods = [('push all', push_all), ('heapq.nlargest', lambda k: heapq.nlargest(k, stream())),
+               ('TopK.extend', topk_extend), ('TopK.extend_array', topk_array)]
+
+    print '\t'.join(['n', 'k'] + [name for name, _ in methods])
+    for k in ks:
+        times, results = [], []
+        for name, fn in methods:
+            if fn is push_all and n > push_all_limit:
+                times.append('-')
+                continue
+            start = time()
+            results.append(fn(k))
+            times.append('{:0.3f}'.format(time() - start))
+        assert all(result == results[0] for result in results)
+        print '\t'.join([str(n), str(k)] + times)
+
+
+if __name__ == '__main__':
+    test_topk(10 ** 5, 100)
+    benchmark()